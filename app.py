@@ -4,24 +4,35 @@ A comprehensive API for analyzing NIFTY options with real-time data from NSE Ind
 Greeks calculation, portfolio analysis, and advanced options analytics.
 """
 
+import os
+
+# One BLAS and one Numba thread per process; the uvicorn and chain pool workers already use every core
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+os.environ.setdefault("NUMBA_NUM_THREADS", "1")
+
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Union
-import pandas as pd
+from typing import Any, Dict, List, Optional
 import numpy as np
-from datetime import datetime, timedelta
-import json
+from datetime import datetime
 import time
-import os
+import hashlib
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+import orjson
 from loguru import logger
-from nifty_greeks import NSEFinanceAPI, NiftyOptionsChain, GreeksCalculator, PortfolioGreeksCalculator
-from enhanced_oi_calculator import OpenInterestCalculator, MarketDataEnhancer
+from nifty_greeks import NSEFinanceAPI, GreeksCalculator, PortfolioGreeksCalculator
+from enhanced_oi_calculator import OpenInterestCalculator
+from chain_compute import compute_chain, init_worker
+import bs_kernels
 
 # Configure Loguru logging
+# Sinks are enqueued so file writes happen on loguru's writer thread, not in the request path
 logger.remove()  # Remove default handler
 logger.add(
     "logs/fastapi_nse.log",
@@ -29,8 +40,9 @@ logger.add(
     retention="30 days",
     level="INFO",
     format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}",
-    backtrace=True,
-    diagnose=True
+    enqueue=True,
+    backtrace=False,
+    diagnose=False
 )
 logger.add(
     "logs/error.log",
@@ -38,15 +50,107 @@ logger.add(
     retention="30 days",
     level="ERROR",
     format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}",
-    backtrace=True,
-    diagnose=True
-)
-# Console logging for development
-logger.add(
-    lambda msg: print(msg, end=""),
-    level="INFO",
-    format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>"
+    enqueue=True,
+    backtrace=False,
+    diagnose=False
 )
+# Console logging for development only (set DEV=1)
+if os.getenv("DEV"):
+    logger.add(
+        lambda msg: print(msg, end=""),
+        level="INFO",
+        format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>"
+    )
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered with orjson; handles NumPy scalars and arrays natively"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+# Chains with more rows than this (~100 KB of JSON) are serialized in chunks as they are sent.
+# The row dicts are already in memory by then; streaming only gets the first bytes out sooner and
+# avoids a second, whole-body copy of the JSON
+STREAM_ROW_THRESHOLD = 180
+STREAM_CHUNK_ROWS = 64
+
+def iter_json_payload(payload: Dict[str, Any], rows_key: str = "data", chunk_rows: int = STREAM_CHUNK_ROWS):
+    """Yield a JSON object in pieces, serializing the rows list a chunk at a time"""
+    yield b"{"
+    for index, (key, value) in enumerate(payload.items()):
+        if index:
+            yield b","
+        yield orjson.dumps(key) + b":"
+        
+        if key != rows_key or not value:
+            yield orjson.dumps(value, option=ORJSON_OPTIONS)
+            continue
+        
+        yield b"["
+        for start in range(0, len(value), chunk_rows):
+            if start:
+                yield b","
+            # Strip the enclosing brackets of each chunk's array
+            yield orjson.dumps(value[start:start + chunk_rows], option=ORJSON_OPTIONS)[1:-1]
+        yield b"]"
+    yield b"}"
+
+# Response timestamps are formatted by a background ticker instead of on every request
+TIMESTAMP_REFRESH_INTERVAL = 0.5  # seconds
+_timestamp_cache = {"iso": "", "updated_at": 0.0}
+
+def _refresh_timestamp():
+    _timestamp_cache["iso"] = datetime.now().isoformat()
+    _timestamp_cache["updated_at"] = time.monotonic()
+
+def current_timestamp() -> str:
+    """ISO timestamp for response bodies, at most about half a second old"""
+    # Refresh inline if the ticker is not running (e.g. app used without its lifespan)
+    if time.monotonic() - _timestamp_cache["updated_at"] > 2 * TIMESTAMP_REFRESH_INTERVAL:
+        _refresh_timestamp()
+    return _timestamp_cache["iso"]
+
+async def _timestamp_ticker():
+    while True:
+        _refresh_timestamp()
+        await asyncio.sleep(TIMESTAMP_REFRESH_INTERVAL)
+
+# Worker processes for CPU-bound options chain computation. Every uvicorn worker starts its own
+# pool, so by default the cores are split between them: UVICORN_WORKERS x CHAIN_POOL_WORKERS
+# single-threaded processes (see the BLAS/Numba caps above) roughly matches cpu_count.
+UVICORN_WORKERS = int(os.getenv("UVICORN_WORKERS", 4))
+CHAIN_POOL_WORKERS = int(os.getenv("CHAIN_POOL_WORKERS", max(1, (os.cpu_count() or 1) // UVICORN_WORKERS)))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the chain pool and background tasks, and shut them down on exit"""
+    # Spawn (not fork) so workers never inherit locks held by logging or network threads
+    app.state.chain_pool = ProcessPoolExecutor(
+        max_workers=CHAIN_POOL_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker
+    )
+    logger.info(f"Started chain computation pool with {CHAIN_POOL_WORKERS} workers")
+    
+    # Inline pricing endpoints use the Numba kernels in this process too
+    bs_kernels.warmup()
+    
+    # Establish the shared NSE session in the background; startup does not wait on NSE
+    warm_up_task = asyncio.create_task(asyncio.to_thread(nse_api.warm_up))
+    timestamp_task = asyncio.create_task(_timestamp_ticker())
+    
+    yield
+    
+    timestamp_task.cancel()
+    
+    app.state.chain_pool.shutdown(wait=False, cancel_futures=True)
+    logger.info("Chain computation pool shut down")
+    
+    warm_up_task.cancel()
+    nse_api.close()
+    logger.info("NSE session closed")
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -54,7 +158,9 @@ app = FastAPI(
     description="Comprehensive NIFTY options analysis with real-time NSE India data",
     version="4.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=OrjsonResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -70,7 +176,11 @@ app.add_middleware(
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log all HTTP requests and responses"""
-    start_time = time.time()
+    # Health probes hit this endpoint every second; keep them out of the logs
+    if request.url.path == "/health":
+        return await call_next(request)
+    
+    start_time = time.perf_counter()
     
     # Log request
     logger.info(f">>> {request.method} {request.url}")
@@ -79,7 +189,7 @@ async def log_requests(request: Request, call_next):
     response = await call_next(request)
     
     # Calculate processing time
-    process_time = time.time() - start_time
+    process_time = time.perf_counter() - start_time
     
     # Log response
     logger.info(f"<<< {request.method} {request.url} - {response.status_code} - {process_time:.3f}s")
@@ -108,6 +218,17 @@ class Position(BaseModel):
     days_to_expiry: int = Field(30, description="Days to expiry")
     volatility: float = Field(0.20, description="Implied volatility")
 
+class BatchGreeksItem(BaseModel):
+    strike: float = Field(..., gt=0, description="Strike price")
+    option_type: str = Field(..., pattern="^(call|put)$", description="Option type")
+    days_to_expiry: int = Field(..., gt=0, description="Days to expiry")
+    volatility: float = Field(0.20, gt=0, description="Implied volatility")
+
+class BatchGreeksRequest(BaseModel):
+    spot_price: float = Field(..., gt=0, description="Current spot price")
+    risk_free_rate: float = Field(0.065, description="Risk-free rate")
+    items: List[BatchGreeksItem] = Field(..., min_length=1, description="Options to price")
+
 class PortfolioGreeksRequest(BaseModel):
     positions: List[Position] = Field(..., description="List of positions")
     spot_price: Optional[float] = Field(None, description="Current spot price (will fetch if not provided)")
@@ -136,20 +257,55 @@ class StatusResponse(BaseModel):
     api_version: str
     endpoints_available: int
 
-# Initialize components
+# Initialize components (chain generation components live in chain_compute workers)
 nse_api = NSEFinanceAPI()
-options_chain = NiftyOptionsChain()
 greeks_calc = GreeksCalculator()
 portfolio_calc = PortfolioGreeksCalculator()
 oi_calculator = OpenInterestCalculator()
-market_enhancer = MarketDataEnhancer()
+
+# Short-lived NIFTY price cache so bursts of requests share one upstream NSE fetch
+PRICE_CACHE_TTL = 1.5  # seconds
+_price_cache = {"value": None, "fetched_at": 0.0}
+_price_lock = asyncio.Lock()
+
+async def cached_nifty_price(ttl: float = PRICE_CACHE_TTL) -> Optional[float]:
+    """Get NIFTY price, reusing a recent fetch; concurrent misses wait on a single upstream call"""
+    if _price_cache["value"] is not None and time.monotonic() - _price_cache["fetched_at"] < ttl:
+        return _price_cache["value"]
+    
+    async with _price_lock:
+        # Another request may have refreshed the cache while we were waiting
+        if _price_cache["value"] is not None and time.monotonic() - _price_cache["fetched_at"] < ttl:
+            return _price_cache["value"]
+        
+        price = await asyncio.to_thread(nse_api.get_nifty_price)
+        _price_cache["value"] = price
+        _price_cache["fetched_at"] = time.monotonic()
+        return price
+
+# Strike offsets for the OI chart: 10 strikes either side of ATM at 50-point spacing
+_OI_OFFSETS = np.arange(-10, 11, dtype=np.int64) * 50
+
+# Browser/proxy caching for read-mostly endpoints
+HTTP_CACHE_MAX_AGE = 2  # seconds
+
+def cached_json_response(request: Request, payload: Dict[str, Any], max_age: int = HTTP_CACHE_MAX_AGE) -> Response:
+    """Return payload with ETag and Cache-Control headers, or 304 if the client's copy is current"""
+    # The top-level timestamp changes on every call, so it is left out of the ETag
+    etag_source = {key: value for key, value in payload.items() if key != "timestamp"}
+    digest = hashlib.md5(orjson.dumps(etag_source, option=ORJSON_OPTIONS | orjson.OPT_SORT_KEYS)).hexdigest()
+    headers = {"ETag": f'"{digest}"', "Cache-Control": f"public, max-age={max_age}"}
+    
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return OrjsonResponse(payload, headers=headers)
 
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
     """Serve the main dashboard"""
     try:
         # Get current market data for the dashboard
-        spot_price = nse_api.get_nifty_price()
+        spot_price = await cached_nifty_price()
         
         context = {
             "request": request,
@@ -174,54 +330,54 @@ async def root(request: Request):
 
 @app.get("/health")
 async def health_check():
-    """Simple health check endpoint for Docker"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    """Liveness probe for Docker; never touches NSE"""
+    return {"status": "healthy", "timestamp": current_timestamp()}
 
 @app.get("/api/status", response_model=StatusResponse)
-async def get_status():
+async def get_status(request: Request):
     """Get API status and health check"""
     try:
-        # Test NSE India connection
-        spot_price = nse_api.get_nifty_price()
+        # Test NSE India connection; a price up to 30s old is fresh enough for a status probe
+        spot_price = await cached_nifty_price(ttl=30.0)
         status = "healthy" if spot_price else "degraded"
         
-        return StatusResponse(
+        return cached_json_response(request, StatusResponse(
             status=status,
             data_source="NSE India",
-            timestamp=datetime.now().isoformat(),
+            timestamp=current_timestamp(),
             api_version="4.0.0",
             endpoints_available=8
-        )
+        ).model_dump())
         
     except Exception as e:
         logger.error(f"Status check error: {str(e)}")
         return StatusResponse(
             status="error",
             data_source="NSE India",
-            timestamp=datetime.now().isoformat(),
-            api_version="3.0.0",
+            timestamp=current_timestamp(),
+            api_version="4.0.0",
             endpoints_available=8
         )
 
 @app.get("/api/nifty-price")
-async def get_nifty_price():
+async def get_nifty_price(request: Request):
     """Get current NIFTY 50 price"""
     try:
         logger.info("NIFTY price requested")
-        spot_price = nse_api.get_nifty_price()
+        spot_price = await cached_nifty_price()
         
         if spot_price is None:
             raise HTTPException(status_code=503, detail="Could not fetch NIFTY price")
         
-        return {
+        return cached_json_response(request, {
             "success": True,
             "data": {
                 "spot_price": spot_price,
                 "symbol": "NIFTY 50",
                 "source": "NSE India"
             },
-            "timestamp": datetime.now().isoformat()
-        }
+            "timestamp": current_timestamp()
+        })
         
     except HTTPException:
         raise
@@ -230,7 +386,7 @@ async def get_nifty_price():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/historical-volatility")
-async def get_historical_volatility(days: int = 30):
+async def get_historical_volatility(request: Request, days: int = 30):
     """Get historical volatility for NIFTY"""
     try:
         logger.info(f"Historical volatility requested for {days} days")
@@ -238,9 +394,9 @@ async def get_historical_volatility(days: int = 30):
         if days < 5 or days > 252:
             raise HTTPException(status_code=400, detail="Days must be between 5 and 252")
         
-        volatility = nse_api.calculate_historical_volatility(days)
+        volatility = await asyncio.to_thread(nse_api.calculate_historical_volatility, days)
         
-        return {
+        return cached_json_response(request, {
             "success": True,
             "data": {
                 "volatility": volatility,
@@ -248,8 +404,8 @@ async def get_historical_volatility(days: int = 30):
                 "period_days": days,
                 "annualized": True
             },
-            "timestamp": datetime.now().isoformat()
-        }
+            "timestamp": current_timestamp()
+        })
         
     except HTTPException:
         raise
@@ -257,7 +413,8 @@ async def get_historical_volatility(days: int = 30):
         logger.error(f"Error calculating volatility: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/options-chain", response_model=GreeksResponse)
+# The chain payload is returned directly; validating hundreds of row dicts on egress is pure overhead
+@app.post("/api/options-chain", responses={200: {"model": GreeksResponse}})
 async def generate_options_chain(request: OptionsChainRequest):
     """Generate complete NIFTY options chain with Greeks and Enhanced OI Analysis"""
     try:
@@ -271,71 +428,47 @@ async def generate_options_chain(request: OptionsChainRequest):
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid expiry date format. Use YYYY-MM-DD")
         
-        # Generate base options chain
-        df = options_chain.generate_options_chain(
-            spot_price=request.spot_price,
-            expiry_date=expiry_date,
-            volatility=request.volatility,
-            risk_free_rate=request.risk_free_rate,
-            num_strikes=request.num_strikes,
-            atm_only=request.atm_only
-        )
-        
-        # Convert DataFrame to list of dictionaries
-        options_data = df.to_dict('records')
-        
-        # Get spot price and volatility for enhancements
-        spot_price = float(df.iloc[0]['spot_price'])
-        volatility = float(df.iloc[0]['implied_volatility'])
-        
-        # Enhance options data with realistic OI and market data
-        logger.info("Enhancing options data with realistic Open Interest patterns")
-        enhanced_options_data = market_enhancer.enhance_options_data(
-            options_data, spot_price, volatility
-        )
-        
-        # Calculate comprehensive analytics including OI analysis
-        logger.info("Calculating comprehensive market analytics")
-        comprehensive_analytics = market_enhancer.calculate_comprehensive_analytics(
-            enhanced_options_data, spot_price
-        )
-        
-        # Use comprehensive analytics as analysis
-        analysis = comprehensive_analytics
+        # Resolve missing spot price and volatility here, concurrently, so their NSE round-trips
+        # overlap and the worker reuses the shared price cache
+        spot_price, volatility = request.spot_price, request.volatility
+        if spot_price is None or volatility is None:
+            spot_price, volatility = await asyncio.gather(
+                cached_nifty_price() if spot_price is None else asyncio.sleep(0, spot_price),
+                asyncio.to_thread(nse_api.calculate_historical_volatility) if volatility is None else asyncio.sleep(0, volatility)
+            )
         
-        metadata = {
-            "total_options": int(len(enhanced_options_data)),
+        chain_request = {
             "spot_price": spot_price,
-            "expiry_date": str(df.iloc[0]['expiry_date']),
-            "days_to_expiry": int(df.iloc[0]['days_to_expiry']),
-            "implied_volatility": volatility,
-            "risk_free_rate": float(request.risk_free_rate),
-            "strikes_range": {
-                "min": float(df['strike'].min()),
-                "max": float(df['strike'].max()),
-                "count": int(len(df['strike'].unique()))
-            },
-            "oi_enhancement": "Theoretical OI patterns based on market behavior",
-            "data_features": [
-                "Theoretical Option Pricing (Black-Scholes)",
-                "Complete Greeks Calculation",
-                "Realistic Open Interest Patterns", 
-                "Max Pain Analysis",
-                "Support/Resistance Identification",
-                "Put-Call Ratio Analysis"
-            ]
+            "expiry_date": expiry_date,
+            "volatility": volatility,
+            "risk_free_rate": request.risk_free_rate,
+            "num_strikes": request.num_strikes,
+            "atm_only": request.atm_only
         }
         
+        # Chain generation and OI analytics are CPU-bound; run them off the event loop.
+        # Falls back to the default thread pool when the app started without its lifespan.
+        logger.info("Generating options chain with enhanced OI analysis")
+        chain_pool = getattr(app.state, "chain_pool", None)
+        result = await asyncio.get_running_loop().run_in_executor(chain_pool, compute_chain, chain_request)
+        enhanced_options_data = result["data"]
+        
         logger.success(f"Generated enhanced options chain with {len(enhanced_options_data)} options and comprehensive OI analysis")
         
-        return GreeksResponse(
-            success=True,
-            data=enhanced_options_data,
-            analytics=analysis,
-            metadata=metadata,
-            data_source="NSE India + Enhanced OI Analysis",
-            timestamp=datetime.now().isoformat()
-        )
+        payload = {
+            "success": True,
+            "data": enhanced_options_data,
+            "analytics": result["analytics"],
+            "metadata": result["metadata"],
+            "data_source": "NSE India + Enhanced OI Analysis",
+            "timestamp": current_timestamp(),
+            "error": None
+        }
+        
+        # Large chains are streamed for time-to-first-byte; the payload itself is fully built above
+        if len(enhanced_options_data) > STREAM_ROW_THRESHOLD:
+            return StreamingResponse(iter_json_payload(payload), media_type="application/json")
+        return OrjsonResponse(payload)
         
     except HTTPException:
         raise
@@ -357,7 +490,7 @@ async def calculate_implied_volatility(request: ImpliedVolatilityRequest):
             K=request.strike_price,
             T=time_to_expiry,
             r=request.risk_free_rate,
-            option_type=request.option_type.lower()
+            option_type=request.option_type
         )
         
         return {
@@ -371,7 +504,7 @@ async def calculate_implied_volatility(request: ImpliedVolatilityRequest):
                 "days_to_expiry": request.days_to_expiry,
                 "option_type": request.option_type.upper()
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": current_timestamp()
         }
         
     except Exception as e:
@@ -387,7 +520,7 @@ async def calculate_portfolio_greeks(request: PortfolioGreeksRequest):
         # Get spot price if not provided
         spot_price = request.spot_price
         if spot_price is None:
-            spot_price = nse_api.get_nifty_price()
+            spot_price = await cached_nifty_price()
             if spot_price is None:
                 raise HTTPException(status_code=503, detail="Could not fetch current NIFTY price")
         
@@ -402,7 +535,7 @@ async def calculate_portfolio_greeks(request: PortfolioGreeksRequest):
         return {
             "success": True,
             "data": result,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": current_timestamp()
         }
         
     except HTTPException:
@@ -424,28 +557,20 @@ async def calculate_single_option_greeks(
     try:
         logger.info(f"Single option Greeks calculation requested: {option_type.upper()} {strike_price}")
         
-        if option_type.lower() not in ['call', 'put']:
+        option_type = option_type.lower()
+        if option_type not in ['call', 'put']:
             raise HTTPException(status_code=400, detail="Option type must be 'call' or 'put'")
+        is_call = option_type == 'call'
         
         time_to_expiry = days_to_expiry / 365.0
         
-        # Calculate option price
-        if option_type.lower() == 'call':
-            option_price = greeks_calc.black_scholes_call(
-                spot_price, strike_price, time_to_expiry, risk_free_rate, volatility
-            )
-        else:
-            option_price = greeks_calc.black_scholes_put(
-                spot_price, strike_price, time_to_expiry, risk_free_rate, volatility
-            )
-        
-        # Calculate Greeks
-        greeks = greeks_calc.calculate_greeks(
-            spot_price, strike_price, time_to_expiry, risk_free_rate, volatility, option_type.lower()
+        # Calculate option price and Greeks (served from the calculator's cache on repeat requests)
+        option_price, greeks = greeks_calc.price_and_greeks(
+            spot_price, strike_price, time_to_expiry, risk_free_rate, volatility, option_type
         )
         
         # Calculate additional metrics
-        if option_type.lower() == 'call':
+        if is_call:
             intrinsic_value = max(spot_price - strike_price, 0)
         else:
             intrinsic_value = max(strike_price - spot_price, 0)
@@ -453,8 +578,8 @@ async def calculate_single_option_greeks(
         time_value = max(option_price - intrinsic_value, 0)
         
         moneyness = 'ATM' if abs(strike_price - spot_price) <= 25 else ('ITM' if (
-            (option_type.lower() == 'call' and strike_price < spot_price) or
-            (option_type.lower() == 'put' and strike_price > spot_price)
+            (is_call and strike_price < spot_price) or
+            (not is_call and strike_price > spot_price)
         ) else 'OTM')
         
         result = {
@@ -479,7 +604,7 @@ async def calculate_single_option_greeks(
         return {
             "success": True,
             "data": result,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": current_timestamp()
         }
         
     except HTTPException:
@@ -488,12 +613,71 @@ async def calculate_single_option_greeks(
         logger.error(f"Error calculating option Greeks: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/option-greeks/batch")
+async def calculate_batch_option_greeks(request: BatchGreeksRequest):
+    """Calculate prices and Greeks for many options in a single vectorized call"""
+    try:
+        logger.info(f"Batch option Greeks calculation requested for {len(request.items)} options")
+        
+        items = request.items
+        strikes = np.fromiter((item.strike for item in items), dtype=np.float64, count=len(items))
+        time_to_expiry = np.fromiter((item.days_to_expiry for item in items), dtype=np.float64, count=len(items)) / 365.0
+        volatility = np.fromiter((item.volatility for item in items), dtype=np.float64, count=len(items))
+        is_call = np.fromiter((item.option_type == 'call' for item in items), dtype=bool, count=len(items))
+        
+        result = greeks_calc.calculate_greeks_batch(
+            request.spot_price, strikes, time_to_expiry, request.risk_free_rate, volatility, is_call
+        )
+        
+        return {
+            "success": True,
+            "data": {
+                "spot_price": request.spot_price,
+                "risk_free_rate": request.risk_free_rate,
+                "strike": strikes.tolist(),
+                "option_type": np.where(is_call, 'CALL', 'PUT').tolist(),
+                "theoretical_price": np.round(result['price'], 2).tolist(),
+                "delta": np.round(result['delta'], 6).tolist(),
+                "gamma": np.round(result['gamma'], 8).tolist(),
+                "theta": np.round(result['theta'], 6).tolist(),
+                "vega": np.round(result['vega'], 6).tolist(),
+                "rho": np.round(result['rho'], 6).tolist()
+            },
+            "timestamp": current_timestamp()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error calculating batch option Greeks: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def clear_caches():
+    """Clear in-process price and Greeks caches"""
+    cache_info = greeks_calc.cache_info()
+    greeks_calc.cache_clear()
+    _price_cache["value"] = None
+    _price_cache["fetched_at"] = 0.0
+    
+    logger.info("Caches cleared")
+    return {
+        "success": True,
+        "data": {
+            "greeks_cache_hits": cache_info.hits,
+            "greeks_cache_misses": cache_info.misses,
+            "greeks_cache_entries": cache_info.currsize
+        },
+        "timestamp": current_timestamp()
+    }
+
+# Unauthenticated and state-changing, so only registered in development (set DEV=1)
+if os.getenv("DEV"):
+    app.add_api_route("/api/cache/clear", clear_caches, methods=["POST"])
+
 @app.get("/api/info")
-async def get_api_info():
+async def get_api_info(request: Request):
     """Get comprehensive API information"""
     try:
         # Test data source connectivity
-        spot_price = nse_api.get_nifty_price()
+        spot_price = await cached_nifty_price()
         data_status = "connected" if spot_price else "disconnected"
         
         api_info = {
@@ -527,48 +711,37 @@ async def get_api_info():
                 "POST /api/calculate-implied-volatility - Calculate IV",
                 "POST /api/portfolio-greeks - Portfolio analysis",
                 "GET /api/option-greeks - Single option Greeks",
+                "POST /api/option-greeks/batch - Batch option Greeks",
                 "GET /api/info - This endpoint"
             ],
             "documentation": {
                 "swagger_ui": "/docs",
                 "redoc": "/redoc"
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": current_timestamp()
         }
         
         logger.info("API info requested")
-        return api_info
+        return cached_json_response(request, api_info)
         
     except Exception as e:
         logger.error(f"API info error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-# Health check endpoint
-@app.get("/health")
-async def health_check():
-    """Simple health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "version": "3.0.0"
-    }
-
 @app.get("/api/oi-chart-data")
-async def get_oi_chart_data():
+async def get_oi_chart_data(request: Request):
     """Generate sample OI chart data for testing the enhanced visualization"""
     try:
         logger.info("OI chart data requested")
         
         # Get current spot price
-        spot_price = nse_api.get_nifty_price()
+        spot_price = await cached_nifty_price()
         if not spot_price:
             spot_price = 24350  # Fallback
             
         # Generate strikes around current price
-        strikes = []
-        base_strike = round(spot_price / 50) * 50
-        for i in range(-10, 11):
-            strikes.append(base_strike + (i * 50))
+        base_strike = int(round(spot_price / 50)) * 50
+        strikes = base_strike + _OI_OFFSETS
         
         # Calculate theoretical OI
         oi_data = oi_calculator.calculate_theoretical_oi(
@@ -596,13 +769,14 @@ async def get_oi_chart_data():
             },
             "metadata": {
                 "total_strikes": len(strikes),
-                "strike_range": f"{min(strikes)} - {max(strikes)}",
-                "generated_at": datetime.now().isoformat()
+                "strike_range": f"{strikes[0]} - {strikes[-1]}",
+                "generated_at": current_timestamp()
             }
         }
         
         logger.success("Generated OI chart data successfully")
-        return response_data
+        # Sample OI is re-randomised on every call, so an ETag would never match
+        return OrjsonResponse(response_data)
         
     except Exception as e:
         logger.error(f"Error generating OI chart data: {str(e)}")
@@ -611,9 +785,12 @@ async def get_oi_chart_data():
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
-        "fastapi_nse:app", 
+        "app:app", 
         host="0.0.0.0", 
         port=8000, 
-        reload=True,
-        log_level="info"
+        workers=UVICORN_WORKERS,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False  # Requests are already logged by the loguru middleware
     )
@@ -0,0 +1,210 @@
+"""
+Compiled Black-Scholes Kernels
+Scalar pricing and implied volatility routines written against the math module
+so Numba can JIT-compile them. Falls back to plain Python when Numba is missing.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:  # Numba is optional; the kernels still run as plain Python
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+_INV_SQRT_2 = 0.7071067811865476    # 1 / sqrt(2)
+_INV_SQRT_2PI = 0.3989422804014327  # 1 / sqrt(2 * pi)
+
+# Fast-math flags without nnan/ninf: the kernels return NaN on non-convergence and produce
+# inf/NaN for degenerate inputs, and callers test for those, so the checks must not be optimised away
+_FASTMATH = {'contract', 'arcp', 'reassoc'}
+
+# Volatility bracket used by the implied volatility solver
+MIN_VOLATILITY = 1e-6
+MAX_VOLATILITY = 5.0
+
+# Below this many options the parallel kernel's thread start-up costs more than it saves
+PARALLEL_MIN_BATCH = 20000
+
+
+def is_call_option(option_type: str) -> bool:
+    """True for 'call'/'CALL'/'CE' labels; checks the first character instead of lower()-ing"""
+    return option_type[:1] in ('c', 'C')
+
+
+def is_put_option(option_type: str) -> bool:
+    """True for 'put'/'PUT'/'PE' labels; same first-character rule as is_call_option"""
+    return option_type[:1] in ('p', 'P')
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def norm_cdf(x: float) -> float:
+    """Standard normal CDF via math.erfc (keeps precision in the far tails)"""
+    return 0.5 * math.erfc(-x * _INV_SQRT_2)
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def norm_pdf(x: float) -> float:
+    """Standard normal PDF"""
+    return _INV_SQRT_2PI * math.exp(-0.5 * x * x)
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def price_and_vega(S: float, K: float, T: float, r: float, sigma: float, is_call: bool):
+    """Black-Scholes price and raw (unscaled) vega for a single option"""
+    sqrt_t = math.sqrt(T)
+    d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / (sigma * sqrt_t)
+    d2 = d1 - sigma * sqrt_t
+    discounted_k = K * math.exp(-r * T)
+
+    if is_call:
+        price = S * norm_cdf(d1) - discounted_k * norm_cdf(d2)
+    else:
+        price = discounted_k * norm_cdf(-d2) - S * norm_cdf(-d1)
+
+    return price, S * norm_pdf(d1) * sqrt_t
+
+
+@njit(cache=True, fastmath=_FASTMATH, error_model='numpy')
+def price_and_greeks(S: float, K: float, T: float, r: float, sigma: float, is_call: bool):
+    """
+    Black-Scholes price and all Greeks from a single set of d1/d2 terms
+    
+    Returns (price, delta, gamma, theta, vega, rho) with theta per calendar day
+    and vega/rho per 1% move, the conventions used by GreeksCalculator.
+    """
+    if T <= 0.0:
+        if is_call:
+            return max(S - K, 0.0), 1.0 if S > K else 0.0, 0.0, 0.0, 0.0, 0.0
+        return max(K - S, 0.0), -1.0 if S < K else 0.0, 0.0, 0.0, 0.0, 0.0
+
+    sqrt_t = math.sqrt(T)
+    d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / (sigma * sqrt_t)
+    d2 = d1 - sigma * sqrt_t
+    pdf_d1 = norm_pdf(d1)
+    discounted_k = K * math.exp(-r * T)
+
+    # Gamma, vega and the time-decay part of theta are the same for calls and puts
+    gamma = pdf_d1 / (S * sigma * sqrt_t)
+    vega = S * pdf_d1 * sqrt_t / 100.0
+    theta_decay = -S * pdf_d1 * sigma / (2.0 * sqrt_t)
+
+    if is_call:
+        nd1 = norm_cdf(d1)
+        nd2 = norm_cdf(d2)
+        price = S * nd1 - discounted_k * nd2
+        delta = nd1
+        theta = (theta_decay - r * discounted_k * nd2) / 365.0
+        rho = discounted_k * T * nd2 / 100.0
+    else:
+        n_minus_d1 = norm_cdf(-d1)
+        n_minus_d2 = norm_cdf(-d2)
+        price = discounted_k * n_minus_d2 - S * n_minus_d1
+        delta = -n_minus_d1
+        theta = (theta_decay + r * discounted_k * n_minus_d2) / 365.0
+        rho = -discounted_k * T * n_minus_d2 / 100.0
+
+    return max(price, 0.0), delta, gamma, theta, vega, rho
+
+
+@njit(cache=True, fastmath=_FASTMATH, error_model='numpy')
+def _store_price_and_greeks(out: np.ndarray, i: int, S: float, K: float, T: float, r: float,
+                            sigma: float, is_call: bool):
+    """Write price_and_greeks for one option into column i of a (6, n) output array"""
+    price, delta, gamma, theta, vega, rho = price_and_greeks(S, K, T, r, sigma, is_call)
+    out[0, i] = price
+    out[1, i] = delta
+    out[2, i] = gamma
+    out[3, i] = theta
+    out[4, i] = vega
+    out[5, i] = rho
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def chain_price_and_greeks(S: float, K: np.ndarray, T: np.ndarray, r: float,
+                           sigma: np.ndarray, is_call: np.ndarray) -> np.ndarray:
+    """
+    Price and Greeks for a batch of options in a single-threaded loop
+    
+    K, T, sigma and is_call are equal-length 1-D arrays. Returns a (6, n) array whose
+    rows are price, delta, gamma, theta, vega and rho, as from price_and_greeks.
+    Safe to call from any number of threads.
+    """
+    n = K.shape[0]
+    out = np.empty((6, n))
+    for i in range(n):
+        _store_price_and_greeks(out, i, S, K[i], T[i], r, sigma[i], is_call[i])
+    return out
+
+
+@njit(cache=True, parallel=True, fastmath=_FASTMATH)
+def chain_price_and_greeks_parallel(S: float, K: np.ndarray, T: np.ndarray, r: float,
+                                    sigma: np.ndarray, is_call: np.ndarray) -> np.ndarray:
+    """
+    chain_price_and_greeks with one option per parallel lane, for very large batches
+    
+    Numba's default workqueue threading layer aborts the process if two threads enter
+    a parallel kernel at once, so only call this from a single thread.
+    """
+    n = K.shape[0]
+    out = np.empty((6, n))
+    for i in prange(n):
+        _store_price_and_greeks(out, i, S, K[i], T[i], r, sigma[i], is_call[i])
+    return out
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def implied_volatility(option_price: float, S: float, K: float, T: float, r: float,
+                       is_call: bool, max_iterations: int, tolerance: float) -> float:
+    """Newton-Raphson implied volatility with a bisection fallback; NaN if it does not converge"""
+    if T <= 0.0 or option_price <= 0.0:
+        return math.nan
+
+    low = MIN_VOLATILITY
+    high = MAX_VOLATILITY
+    sigma = 0.3
+
+    for _ in range(max_iterations):
+        price, vega = price_and_vega(S, K, T, r, sigma, is_call)
+        diff = price - option_price
+
+        if abs(diff) < tolerance:
+            return sigma
+
+        # Price is increasing in sigma, so the sign of diff tightens the bracket
+        if diff > 0.0:
+            high = sigma
+        else:
+            low = sigma
+
+        # Newton step, bisecting whenever vega vanishes or the step leaves the bracket.
+        # The bracket spans several decades, so bisect in log space (the geometric mean
+        # tracks the midpoint of the IEEE-754 bit patterns for positive floats)
+        next_sigma = math.sqrt(low * high)
+        if vega > 1e-10:
+            newton_sigma = sigma - diff / vega
+            if low < newton_sigma < high:
+                next_sigma = newton_sigma
+        sigma = next_sigma
+
+    return math.nan
+
+
+def warmup():
+    """
+    Compile (or load from Numba's cache) the serial kernels ahead of the first request
+    
+    Called by long-running processes at startup so importing this module stays cheap.
+    The parallel chain kernel is left to compile on first use.
+    """
+    implied_volatility(10.0, 100.0, 100.0, 0.1, 0.05, True, 1, 1e-5)
+    price_and_greeks(100.0, 100.0, 0.1, 0.05, 0.2, True)
+    chain_price_and_greeks(100.0, np.array([100.0]), np.array([0.1]), 0.05, np.array([0.2]), np.array([True]))
@@ -0,0 +1,101 @@
+"""
+Options Chain Computation
+CPU-bound chain generation and OI analytics as a top-level, picklable function
+so the API can run it in a ProcessPoolExecutor instead of on the event loop.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+import bs_kernels
+from nifty_greeks import NiftyOptionsChain
+from enhanced_oi_calculator import MarketDataEnhancer
+
+# Per-process components, created on first use inside each pool worker
+_options_chain: Optional[NiftyOptionsChain] = None
+_market_enhancer: Optional[MarketDataEnhancer] = None
+
+
+def init_worker():
+    """Pool initializer: compile the pricing kernels before the worker takes a request"""
+    bs_kernels.warmup()
+
+
+def _get_components():
+    """Return this process's options chain generator and market data enhancer"""
+    global _options_chain, _market_enhancer
+
+    if _options_chain is None:
+        _options_chain = NiftyOptionsChain()
+        _market_enhancer = MarketDataEnhancer()
+
+    return _options_chain, _market_enhancer
+
+
+def compute_chain(request: Dict) -> Dict:
+    """Generate an options chain with enhanced OI data, analytics and metadata
+
+    Args:
+        request: Options chain parameters (spot_price, expiry_date as datetime,
+                 volatility, risk_free_rate, num_strikes, atm_only)
+    """
+    options_chain, market_enhancer = _get_components()
+
+    # Generate base options chain
+    df = options_chain.generate_options_chain(
+        spot_price=request.get('spot_price'),
+        expiry_date=request.get('expiry_date'),
+        volatility=request.get('volatility'),
+        risk_free_rate=request.get('risk_free_rate', 0.065),
+        num_strikes=request.get('num_strikes', 31),
+        atm_only=request.get('atm_only', False)
+    )
+
+    # Build row dicts straight from the column arrays (native Python scalars via tolist)
+    columns = {col: df[col].to_numpy().tolist() for col in df.columns}
+    options_data = [dict(zip(columns, row)) for row in zip(*columns.values())]
+    strikes = df['strike'].to_numpy()
+
+    # Chain-level scalars come from the DataFrame attrs set by the generator
+    spot_price = df.attrs['spot_price']
+    volatility = df.attrs['implied_volatility']
+
+    # Enhance options data with realistic OI and market data
+    enhanced_options_data = market_enhancer.enhance_options_data(
+        options_data, spot_price, volatility
+    )
+
+    # Calculate comprehensive analytics including OI analysis
+    analytics = market_enhancer.calculate_comprehensive_analytics(
+        enhanced_options_data, spot_price
+    )
+
+    metadata = {
+        "total_options": int(len(enhanced_options_data)),
+        "spot_price": spot_price,
+        "expiry_date": df.attrs['expiry_date'],
+        "days_to_expiry": df.attrs['days_to_expiry'],
+        "implied_volatility": volatility,
+        "risk_free_rate": float(request.get('risk_free_rate', 0.065)),
+        "strikes_range": {
+            "min": float(strikes.min()),
+            "max": float(strikes.max()),
+            "count": int(len(np.unique(strikes)))
+        },
+        "oi_enhancement": "Theoretical OI patterns based on market behavior",
+        "data_features": [
+            "Theoretical Option Pricing (Black-Scholes)",
+            "Complete Greeks Calculation",
+            "Realistic Open Interest Patterns",
+            "Max Pain Analysis",
+            "Support/Resistance Identification",
+            "Put-Call Ratio Analysis"
+        ]
+    }
+
+    return {
+        "data": enhanced_options_data,
+        "analytics": analytics,
+        "metadata": metadata
+    }
@@ -2,26 +2,40 @@
 Advanced NSE India Data Fetcher using curl_cffi
 """
 
-from curl_cffi import requests
+from curl_cffi import requests, CurlOpt
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import json
+import orjson
+import io
+import os
+import sys
 import time
+from pathlib import Path
 from typing import Dict, List, Optional
 from loguru import logger
-import warnings
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-warnings.filterwarnings('ignore')
+_logging_configured = False
 
-logger.add(
-    "logs/data_fetcher.log",
-    rotation="1 day",
-    retention="30 days",
-    level="INFO",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}"
-)
+
+def _configure_logging():
+    """Add the fetcher's file sink on first use rather than at import time"""
+    global _logging_configured
+    if _logging_configured:
+        return
+    
+    logger.add(
+        "logs/data_fetcher.log",
+        rotation="1 day",
+        retention="30 days",
+        level="INFO",
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}",
+        enqueue=True
+    )
+    _logging_configured = True
 
 
 class NSEDataFetcher:
@@ -34,75 +48,173 @@ class NSEDataFetcher:
     
     BROWSERS = ["chrome", "safari", "edge"]
     
+    # Keep pooled connections to NSE alive between polls so requests skip the TLS handshake
+    CURL_OPTIONS = {
+        CurlOpt.TCP_KEEPALIVE: 1,
+        CurlOpt.TCP_KEEPIDLE: 30,
+        CurlOpt.TCP_KEEPINTVL: 15,
+        CurlOpt.MAXCONNECTS: 20,
+    }
+    
+    # On-disk options chain cache shared by every process (uvicorn and chain pool workers)
+    CACHE_DIR = Path(os.getenv("NSE_CACHE_DIR", ".cache/nifty"))
+    CHAIN_CACHE_TTL = float(os.getenv("NSE_CHAIN_CACHE_TTL", 60))  # seconds
+    # After a failed chain fetch, callers skip NSE for this long instead of each re-running the retries
+    CHAIN_FAILURE_TTL = float(os.getenv("NSE_CHAIN_FAILURE_TTL", 15))  # seconds
+    
+    ATM_IV_BAND = 100  # strikes within this distance of spot count as at-the-money
+    
+    COOKIE_TTL = 300  # seconds an NSE session cookie is trusted before re-handshaking
+    COOKIE_FILE = CACHE_DIR / "nse_cookies.json"
+    
     def __init__(self):
+        _configure_logging()
         self.session = None
-        self.current_browser = random.choice(self.BROWSERS)
+        self._cookie_expires_at = 0.0
+        # Guards the cookie handshake and session replacement; fetch_all threads share the session
+        self._session_lock = threading.Lock()
+        # Long-lived workers for fetch_all, so curl's per-thread handles and TLS sessions are reused
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="nse-fetch")
+        
+        # Reuse a fresh cookie set (and the browser it was issued to) from an earlier run
+        saved = self._load_cookies()
+        self.current_browser = saved['browser'] if saved else random.choice(self.BROWSERS)
         self._init_session()
+        if saved:
+            for name, value, domain, path in saved['cookies']:
+                self.session.cookies.set(name, value, domain=domain, path=path)
+            self._cookie_expires_at = time.monotonic() + (saved['expires'] - time.time())
+            logger.debug("Restored {} NSE cookies from {}", len(saved['cookies']), self.COOKIE_FILE)
+        
         logger.info(f"NSE Data Fetcher initialized with {self.current_browser} impersonation")
     
     def _init_session(self):
-        if self.session:
-            try:
-                self.session.close()
-            except:
-                pass
-        
-        self.session = requests.Session(impersonate=self.current_browser, timeout=20)
-        logger.debug(f"Session initialized with {self.current_browser} impersonation")
+        # The old session is not closed here: other threads may still be mid-request on it,
+        # and it is released once their local references go away
+        self.session = requests.Session(
+            impersonate=self.current_browser, timeout=20, curl_options=self.CURL_OPTIONS
+        )
+        self._cookie_expires_at = 0.0  # a new session starts without cookies
+        logger.debug("Session initialized with {} impersonation", self.current_browser)
     
-    def _rotate_browser(self):
-        old_browser = self.current_browser
-        self.current_browser = random.choice([b for b in self.BROWSERS if b != self.current_browser])
-        self._init_session()
+    def _rotate_browser(self, stale_session: Optional[requests.Session] = None):
+        """Switch to a new browser and session, unless another thread already replaced stale_session"""
+        with self._session_lock:
+            if stale_session is not None and self.session is not stale_session:
+                return
+            
+            old_browser = self.current_browser
+            self.current_browser = random.choice([b for b in self.BROWSERS if b != self.current_browser])
+            self._init_session()
         logger.info(f"Rotated: {old_browser} -> {self.current_browser}")
     
-    def _refresh_cookies(self) -> bool:
-        try:
-            logger.info("Establishing NSE session")
-            response = self.session.get(f"{self.BASE_URL}/", allow_redirects=True)
-            
-            if response.status_code == 200:
-                logger.success("NSE session established")
+    def _refresh_cookies(self, force: bool = False) -> bool:
+        # A single monotonic comparison on the hot path while the cookies are fresh
+        if not force and time.monotonic() < self._cookie_expires_at:
+            return True
+        
+        # Concurrent fetches wait here so only one thread hits the NSE home page
+        with self._session_lock:
+            if not force and time.monotonic() < self._cookie_expires_at:
                 return True
-            return False
+            
+            try:
+                logger.info("Establishing NSE session")
+                response = self.session.get(f"{self.BASE_URL}/", allow_redirects=True)
+                
+                if response.status_code == 200:
+                    self._cookie_expires_at = time.monotonic() + self.COOKIE_TTL
+                    self._save_cookies()
+                    logger.success("NSE session established")
+                    return True
+                return False
+            except Exception as e:
+                logger.error(f"Error establishing session: {str(e)}")
+                return False
+    
+    def _load_cookies(self) -> Optional[Dict]:
+        """Cookies saved by a previous run, if they have not expired"""
+        try:
+            saved = orjson.loads(self.COOKIE_FILE.read_bytes())
+            if time.time() < saved['expires'] and saved['browser'] in self.BROWSERS:
+                return saved
+        except FileNotFoundError:
+            pass
         except Exception as e:
-            logger.error(f"Error establishing session: {str(e)}")
-            return False
+            logger.warning(f"Could not read saved cookies: {str(e)}")
+        return None
+    
+    def _save_cookies(self):
+        """Persist the session cookies with a wall-clock expiry for the next run"""
+        try:
+            saved = {
+                'browser': self.current_browser,
+                'expires': time.time() + self.COOKIE_TTL,
+                'cookies': [(c.name, c.value, c.domain, c.path) for c in self.session.cookies.jar],
+            }
+            self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.COOKIE_FILE.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(orjson.dumps(saved))
+            os.replace(tmp_path, self.COOKIE_FILE)
+        except Exception as e:
+            logger.warning(f"Could not save cookies: {str(e)}")
     
     def _make_request(self, url: str, max_retries: int = 5) -> Optional[Dict]:
+        backed_off = False  # set when the previous attempt already slept through a long backoff
+        session = self.session
         for attempt in range(max_retries):
             try:
-                if attempt == 0 or attempt == 2:
-                    self._refresh_cookies()
-                
                 if attempt == 3:
-                    self._rotate_browser()
-                    self._refresh_cookies()
+                    self._rotate_browser(session)
                 
-                if attempt > 0:
-                    time.sleep(min(2 ** attempt, 10))
+                # No-op while the session cookies are fresh; the second retry forces a new handshake
+                self._refresh_cookies(force=attempt == 2)
+                
+                # Each attempt uses one session throughout, even if another thread rotates meanwhile
+                session = self.session
+                
+                # Short jittered pause so concurrent fetchers do not retry in lockstep
+                if attempt > 0 and not backed_off:
+                    time.sleep(random.uniform(0.1, 0.3) * (attempt + 1))
+                backed_off = False
                 
-                logger.debug(f"Request to: {url} (attempt {attempt + 1})")
-                response = self.session.get(url, allow_redirects=True)
+                # Formatting is deferred so DEBUG-filtered sinks skip it entirely
+                logger.debug("Request to: {} (attempt {})", url, attempt + 1)
+                response = session.get(url, allow_redirects=True)
                 
                 if response.status_code == 200:
+                    # libcurl negotiates and decodes gzip/br itself; log what NSE actually sent
+                    logger.debug("Content-Encoding: {}", response.headers.get('content-encoding', 'identity'))
                     try:
-                        data = response.json()
+                        data = orjson.loads(response.content)
                         if data:
-                            logger.success(f"Success: {url}")
+                            logger.debug(f"Success: {url}")
                             return data
-                    except json.JSONDecodeError as e:
+                    except orjson.JSONDecodeError as e:
                         logger.error(f"JSON error: {str(e)}")
                         continue
                         
+                elif response.status_code == 401:
+                    logger.warning("401 Unauthorized - session cookies expired")
+                    self._cookie_expires_at = 0.0
+                    continue
+                    
                 elif response.status_code == 403:
                     logger.warning("403 Forbidden - rotating browser")
-                    self._rotate_browser()
+                    self._rotate_browser(session)
                     continue
                     
                 elif response.status_code == 429:
                     logger.warning("429 Too Many Requests")
                     time.sleep(15)
+                    backed_off = True
+                    continue
+                    
+                elif response.status_code == 503:
+                    # Only explicit overload responses get the long exponential backoff
+                    logger.warning("503 Service Unavailable")
+                    time.sleep(min(2 ** attempt, 10))
+                    backed_off = True
                     continue
                     
             except Exception as e:
@@ -113,7 +225,7 @@ class NSEDataFetcher:
     
     def get_nifty_spot_price(self) -> Optional[float]:
         try:
-            logger.info("Fetching NIFTY 50 spot price")
+            logger.debug("Fetching NIFTY 50 spot price")
             data = self._make_request(self.INDICES_DATA_URL)
             
             if data and 'data' in data:
@@ -128,51 +240,151 @@ class NSEDataFetcher:
             logger.error(f"Error: {str(e)}")
             return None
     
-    def get_options_chain(self, symbol: str = "NIFTY") -> Optional[pd.DataFrame]:
+    def get_market_status(self) -> Optional[Dict]:
+        try:
+            logger.debug("Fetching market status")
+            return self._make_request(self.MARKET_STATUS_URL)
+        except Exception as e:
+            logger.error(f"Error: {str(e)}")
+            return None
+    
+    def fetch_all(self, symbol: str = "NIFTY") -> Dict:
+        """Fetch spot price, options chain and market status concurrently"""
+        self._refresh_cookies()
+        
+        futures = {
+            'spot': self._executor.submit(self.get_nifty_spot_price),
+            'chain': self._executor.submit(self.get_options_chain, symbol),
+            'status': self._executor.submit(self.get_market_status),
+        }
+        return {key: future.result() for key, future in futures.items()}
+    
+    # Parquet schema metadata key holding DataFrame.attrs; pandas < 2.1 does not round-trip attrs itself
+    CACHE_ATTRS_KEY = b"nifty_attrs"
+    
+    def _read_cached_frame(self, name: str, ttl: float) -> Optional[pd.DataFrame]:
+        """Load a cached DataFrame (with its attrs) if it was written less than ttl seconds ago"""
+        import pyarrow.parquet as pq
+        
+        path = self.CACHE_DIR / f"{name}.parquet"
+        try:
+            if time.time() - path.stat().st_mtime > ttl:
+                return None
+            table = pq.read_table(path)
+            df = table.to_pandas()
+            attrs = (table.schema.metadata or {}).get(self.CACHE_ATTRS_KEY)
+            if attrs:
+                df.attrs.update(orjson.loads(attrs))
+            logger.debug("Cache hit: {}", path)
+            return df
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read cache {path}: {str(e)}")
+            return None
+    
+    def _write_cached_frame(self, name: str, df: pd.DataFrame):
+        """Atomically write a DataFrame, with its attrs, to the Parquet cache"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        path = self.CACHE_DIR / f"{name}.parquet"
+        try:
+            self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            metadata = {**(table.schema.metadata or {}),
+                        self.CACHE_ATTRS_KEY: orjson.dumps(df.attrs, option=orjson.OPT_SERIALIZE_NUMPY)}
+            pq.write_table(table.replace_schema_metadata(metadata), tmp_path, compression="snappy")
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write cache {path}: {str(e)}")
+    
+    def _recently_failed(self, name: str, ttl: float) -> bool:
+        """True if a fetch for name failed less than ttl seconds ago (in any process)"""
+        try:
+            return time.time() - (self.CACHE_DIR / f"{name}.failed").stat().st_mtime < ttl
+        except OSError:
+            return False
+    
+    def _mark_failed(self, name: str):
+        """Record a failed fetch for name, shared through the cache directory"""
+        try:
+            self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            (self.CACHE_DIR / f"{name}.failed").touch()
+        except OSError as e:
+            logger.warning(f"Could not record failed fetch for {name}: {str(e)}")
+    
+    def get_options_chain(self, symbol: str = "NIFTY") -> Optional[Dict]:
+        """Raw NSE options chain payload for symbol"""
         try:
-            logger.info(f"Fetching options chain for {symbol}")
+            logger.debug(f"Fetching options chain for {symbol}")
             url = f"{self.OPTION_CHAIN_URL}?symbol={symbol}"
             data = self._make_request(url)
             
             if not data or 'records' not in data:
                 return None
             
-            records = data['records']['data']
+            return data
+            
+        except Exception as e:
+            logger.error(f"Error: {str(e)}")
+            return None
+    
+    # (DataFrame column, NSE field) pairs read from each CE/PE leg
+    CHAIN_FIELDS = (
+        ('last_price', 'lastPrice'),
+        ('open_interest', 'openInterest'),
+        ('change_in_oi', 'changeinOpenInterest'),
+        ('volume', 'totalTradedVolume'),
+        ('iv', 'impliedVolatility'),
+    )
+    
+    def _extract_arrays(self, records: List[Dict]) -> Dict[str, np.ndarray]:
+        """Column arrays from NSE chain records: every CALL leg first, then every PUT leg"""
+        groups = []
+        for side, label in (('CE', 'CALL'), ('PE', 'PUT')):
+            # Look up each leg once; the field passes below only bind its .get
+            quoted = [(record, record[side]) for record in records if side in record]
+            
+            group = {
+                'strike': np.array([record['strikePrice'] for record, _ in quoted], dtype=np.float64),
+                'expiry': np.array([record.get('expiryDate') for record, _ in quoted], dtype=object),
+                'option_type': np.full(len(quoted), label, dtype=object),
+            }
+            leg_getters = [leg.get for _, leg in quoted]
+            for column, field in self.CHAIN_FIELDS:
+                group[column] = np.array([get(field) for get in leg_getters], dtype=np.float64)
+            groups.append(group)
+        
+        calls, puts = groups
+        return {column: np.concatenate((calls[column], puts[column])) for column in calls}
+    
+    def get_options_data_df(self, symbol: str = "NIFTY") -> Optional[pd.DataFrame]:
+        """Options chain as a DataFrame with one row per CALL/PUT contract"""
+        try:
+            cached = self._read_cached_frame(f"{symbol}_options_chain", self.CHAIN_CACHE_TTL)
+            if cached is not None:
+                return cached
+            
+            if self._recently_failed(f"{symbol}_options_chain", self.CHAIN_FAILURE_TTL):
+                logger.debug("Skipping {} options chain fetch after a recent failure", symbol)
+                return None
+            
+            data = self.get_options_chain(symbol)
+            records = data['records'].get('data') if data else None
             if not records:
+                self._mark_failed(f"{symbol}_options_chain")
                 return None
             
-            options_data = []
-            for record in records:
-                strike = record.get('strikePrice')
-                expiry = record.get('expiryDate')
-                
-                if 'CE' in record:
-                    ce = record['CE']
-                    options_data.append({
-                        'strike': strike,
-                        'expiry': expiry,
-                        'option_type': 'CE',
-                        'last_price': ce.get('lastPrice'),
-                        'open_interest': ce.get('openInterest'),
-                        'change_in_oi': ce.get('changeinOpenInterest'),
-                        'volume': ce.get('totalTradedVolume'),
-                        'iv': ce.get('impliedVolatility'),
-                    })
-                
-                if 'PE' in record:
-                    pe = record['PE']
-                    options_data.append({
-                        'strike': strike,
-                        'expiry': expiry,
-                        'option_type': 'PE',
-                        'last_price': pe.get('lastPrice'),
-                        'open_interest': pe.get('openInterest'),
-                        'change_in_oi': pe.get('changeinOpenInterest'),
-                        'volume': pe.get('totalTradedVolume'),
-                        'iv': pe.get('impliedVolatility'),
-                    })
+            chain_records = data['records']
             
-            df = pd.DataFrame(options_data)
+            df = pd.DataFrame(self._extract_arrays(records))
+            # Few distinct labels repeated per row: store them as integer-coded categories
+            df['option_type'] = df['option_type'].astype('category')
+            df['expiry'] = df['expiry'].astype('category')
+            df.attrs['underlying_value'] = chain_records.get('underlyingValue')
+            self._write_cached_frame(f"{symbol}_options_chain", df)
             logger.success(f"Fetched {len(df)} options")
             return df
             
@@ -180,22 +392,39 @@ class NSEDataFetcher:
             logger.error(f"Error: {str(e)}")
             return None
     
-    def calculate_historical_volatility(self, days: int = 30) -> float:
+    def calculate_historical_volatility(self, days: int = 30, symbol: str = "NIFTY") -> float:
+        """Average at-the-money implied volatility as a fraction (0.15 when unavailable)"""
         try:
-            df = self.get_options_chain()
+            df = self.get_options_data_df(symbol)
+            
+            if df is None or df.empty:
+                return 0.15
+            
+            strikes = df['strike'].to_numpy(dtype=np.float64)
+            ivs = df['iv'].to_numpy(dtype=np.float64)
+            valid = ivs > 0
             
-            if df is not None and not df.empty and 'iv' in df.columns:
-                valid_ivs = df[df['iv'].notna()]['iv']
-                if len(valid_ivs) > 0:
-                    avg_iv = valid_ivs.mean()
-                    logger.success(f"Volatility from IV: {avg_iv:.2f}%")
-                    return avg_iv
+            # Restrict to strikes near spot when the underlying value is known
+            spot_price = df.attrs.get('underlying_value')
+            if spot_price:
+                valid &= np.abs(strikes - spot_price) < self.ATM_IV_BAND
             
-            return 15.0
+            if valid.any():
+                avg_iv = float(ivs[valid].mean()) / 100
+                logger.success(f"Volatility from ATM IV: {avg_iv:.2%}")
+                return avg_iv
+            
+            return 0.15
         except Exception as e:
-            return 15.0
+            logger.error(f"Error: {str(e)}")
+            return 0.15
+    
+    def warm_up(self) -> bool:
+        """Establish the NSE session ahead of the first data request"""
+        return self._refresh_cookies()
     
     def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
         if self.session:
             try:
                 self.session.close()
@@ -204,12 +433,16 @@ class NSEDataFetcher:
 
 
 _nse_fetcher_instance = None
+_nse_fetcher_lock = threading.Lock()
 
 def get_nse_fetcher() -> NSEDataFetcher:
     """Get singleton NSE data fetcher instance"""
     global _nse_fetcher_instance
     if _nse_fetcher_instance is None:
-        _nse_fetcher_instance = NSEDataFetcher()
+        # Double-checked so concurrent first callers share one fetcher and one cookie handshake
+        with _nse_fetcher_lock:
+            if _nse_fetcher_instance is None:
+                _nse_fetcher_instance = NSEDataFetcher()
     return _nse_fetcher_instance
 
 
@@ -220,43 +453,51 @@ def test_nse_fetcher():
     print("=" * 60)
     
     fetcher = NSEDataFetcher()
+    buf = io.StringIO()
+    
+    # Spot price, options chain and market status are fetched concurrently
+    live = fetcher.fetch_all()
     
     # Test 1: Get spot price
-    print("\n1️⃣ Testing NIFTY spot price...")
-    spot_price = fetcher.get_nifty_spot_price()
+    print("\n1️⃣ Testing NIFTY spot price...", file=buf)
+    spot_price = live['spot']
     if spot_price:
-        print(f"✅ NIFTY 50: ₹{spot_price}")
+        print(f"✅ NIFTY 50: ₹{spot_price}", file=buf)
     else:
-        print("❌ Failed to fetch spot price")
+        print("❌ Failed to fetch spot price", file=buf)
     
     # Test 2: Get options chain
-    print("\n2️⃣ Testing options chain...")
-    chain = fetcher.get_options_chain()
+    print("\n2️⃣ Testing options chain...", file=buf)
+    chain = live['chain']
     if chain:
         records = chain.get('records', {})
-        print(f"✅ Fetched options chain")
-        print(f"   Underlying: {records.get('underlyingValue')}")
-        print(f"   Options: {len(records.get('data', []))} strikes")
+        print(f"✅ Fetched options chain", file=buf)
+        print(f"   Underlying: {records.get('underlyingValue')}", file=buf)
+        print(f"   Options: {len(records.get('data', []))} strikes", file=buf)
     else:
-        print("❌ Failed to fetch options chain")
+        print("❌ Failed to fetch options chain", file=buf)
     
     # Test 3: Get options DataFrame
-    print("\n3️⃣ Testing options DataFrame...")
+    print("\n3️⃣ Testing options DataFrame...", file=buf)
     df = fetcher.get_options_data_df()
     if df is not None and not df.empty:
-        print(f"✅ Created DataFrame with {len(df)} options")
-        print(f"\nSample data:")
-        print(df.head(10))
+        print(f"✅ Created DataFrame with {len(df)} options", file=buf)
+        print(f"\nSample data:", file=buf)
+        print(df.head(10), file=buf)
     else:
-        print("❌ Failed to create DataFrame")
+        print("❌ Failed to create DataFrame", file=buf)
     
     # Test 4: Calculate volatility
-    print("\n4️⃣ Testing volatility calculation...")
+    print("\n4️⃣ Testing volatility calculation...", file=buf)
     vol = fetcher.calculate_historical_volatility()
-    print(f"✅ Calculated volatility: {vol:.2%}")
+    print(f"✅ Calculated volatility: {vol:.2%}", file=buf)
+    
+    print("\n" + "=" * 60, file=buf)
+    print("✅ Testing complete!", file=buf)
     
-    print("\n" + "=" * 60)
-    print("✅ Testing complete!")
+    # Results are collected in memory and written to stdout in one call
+    sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
 
 
 if __name__ == "__main__":
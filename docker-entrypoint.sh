@@ -26,7 +26,7 @@ start_service() {
     case $service in
         "nse")
             echo "🚀 Starting NSE API..."
-            exec uvicorn app:app --host 0.0.0.0 --port 8000 --workers 1
+            exec uvicorn app:app --host 0.0.0.0 --port 8000 --workers ${UVICORN_WORKERS:-4} --loop uvloop --http httptools --no-access-log
             ;;
         *)
             echo "❌ Unknown service: $service"
@@ -8,22 +8,21 @@ theoretical OI patterns based on market behavior and option pricing models.
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
-import random
+from typing import Dict, List, Tuple, Optional, Union
 from loguru import logger
+from bs_kernels import is_call_option, is_put_option
 
 class OpenInterestCalculator:
     """Calculate theoretical Open Interest patterns for NIFTY options"""
     
     def __init__(self):
         self.logger = logger
-        # Set random seed for consistent patterns
-        random.seed(42)
-        np.random.seed(42)
+        # Seeded generator for consistent patterns
+        self.rng = np.random.default_rng(42)
     
     def calculate_theoretical_oi(self, 
                                 spot_price: float, 
-                                strikes: List[float], 
+                                strikes: Union[List[float], np.ndarray], 
                                 volatility: float = 0.20,
                                 days_to_expiry: int = 7) -> Dict[float, Dict[str, float]]:
         """
@@ -31,7 +30,7 @@ class OpenInterestCalculator:
         
         Args:
             spot_price: Current NIFTY spot price
-            strikes: List of strike prices
+            strikes: List or array of strike prices
             volatility: Implied volatility
             days_to_expiry: Days to expiry
             
@@ -40,84 +39,67 @@ class OpenInterestCalculator:
         """
         self.logger.info(f"Calculating theoretical OI for {len(strikes)} strikes around spot {spot_price}")
         
-        oi_data = {}
+        # Keep the caller's strike values (int or float) as the dictionary keys
+        strike_keys = np.asarray(strikes).tolist()
+        strike_values = np.asarray(strikes, dtype=np.float64)
         
         # Base OI levels (in lakhs)
         base_call_oi = 50.0
         base_put_oi = 50.0
         
         # ATM strike
-        atm_strike = min(strikes, key=lambda x: abs(x - spot_price))
+        atm_strike = strike_values[np.argmin(np.abs(strike_values - spot_price))]
+        
+        # Distance from ATM (normalized)
+        distance_from_atm = np.abs(strike_values - atm_strike) / spot_price
+        
+        gap_above = strike_values - spot_price
+        gap_below = spot_price - strike_values
+        near_atm = np.abs(gap_above) <= 100  # ATM range
+        above = strike_values > spot_price
+        below = strike_values < spot_price
+        atm_multiplier = 1.5 + (0.5 * np.exp(-distance_from_atm * 10))
+        
+        # Call OI: higher at ATM and resistance levels (calls sold)
+        call_multiplier = np.select(
+            [near_atm, above & (gap_above % 500 == 0), above & (gap_above % 100 == 0), above],
+            [atm_multiplier, 2.0, 1.3, 0.8 - distance_from_atm],
+            default=0.6 - distance_from_atm * 0.5
+        )
         
-        for strike in strikes:
-            # Distance from ATM (normalized)
-            distance_from_atm = abs(strike - atm_strike) / spot_price
-            
-            # Moneyness factor
-            if strike < spot_price:
-                # ITM calls, OTM puts
-                call_moneyness = (spot_price - strike) / spot_price
-                put_moneyness = 0.1  # Lower OI for OTM puts far from spot
-            elif strike > spot_price:
-                # OTM calls, ITM puts  
-                call_moneyness = 0.1  # Lower OI for OTM calls far from spot
-                put_moneyness = (strike - spot_price) / spot_price
-            else:
-                # ATM
-                call_moneyness = 0.5
-                put_moneyness = 0.5
-            
-            # Calculate Call OI
-            # Higher OI at ATM and resistance levels
-            if abs(strike - spot_price) <= 100:  # ATM range
-                call_multiplier = 1.5 + (0.5 * np.exp(-distance_from_atm * 10))
-            elif strike > spot_price:  # Resistance levels (calls sold)
-                if (strike - spot_price) % 500 == 0:  # Major resistance levels
-                    call_multiplier = 2.0
-                elif (strike - spot_price) % 100 == 0:  # Minor resistance levels
-                    call_multiplier = 1.3
-                else:
-                    call_multiplier = 0.8 - distance_from_atm
-            else:
-                call_multiplier = 0.6 - distance_from_atm * 0.5
-            
-            # Calculate Put OI
-            # Higher OI at support levels and protective puts
-            if abs(strike - spot_price) <= 100:  # ATM range
-                put_multiplier = 1.5 + (0.5 * np.exp(-distance_from_atm * 10))
-            elif strike < spot_price:  # Support levels (puts bought)
-                if (spot_price - strike) % 500 == 0:  # Major support levels
-                    put_multiplier = 2.2
-                elif (spot_price - strike) % 100 == 0:  # Minor support levels
-                    put_multiplier = 1.4
-                else:
-                    put_multiplier = 0.9 - distance_from_atm * 0.3
-            else:
-                put_multiplier = 0.5 - distance_from_atm * 0.4
-            
-            # Apply volatility impact (higher vol = higher OI)
-            vol_factor = 1 + (volatility - 0.15) * 2
-            
-            # Apply time decay factor (closer to expiry = higher activity)
-            time_factor = 1 + (30 - days_to_expiry) / 30 * 0.5
-            
-            # Calculate final OI values
-            call_oi = max(5.0, base_call_oi * call_multiplier * vol_factor * time_factor)
-            put_oi = max(5.0, base_put_oi * put_multiplier * vol_factor * time_factor)
-            
-            # Add some random variation to make it realistic
-            call_oi *= (0.8 + 0.4 * random.random())
-            put_oi *= (0.8 + 0.4 * random.random())
-            
+        # Put OI: higher at support levels and protective puts
+        put_multiplier = np.select(
+            [near_atm, below & (gap_below % 500 == 0), below & (gap_below % 100 == 0), below],
+            [atm_multiplier, 2.2, 1.4, 0.9 - distance_from_atm * 0.3],
+            default=0.5 - distance_from_atm * 0.4
+        )
+        
+        # Apply volatility impact (higher vol = higher OI)
+        vol_factor = 1 + (volatility - 0.15) * 2
+        
+        # Apply time decay factor (closer to expiry = higher activity)
+        time_factor = 1 + (30 - days_to_expiry) / 30 * 0.5
+        
+        # Calculate final OI values
+        call_oi = np.maximum(5.0, base_call_oi * call_multiplier * vol_factor * time_factor)
+        put_oi = np.maximum(5.0, base_put_oi * put_multiplier * vol_factor * time_factor)
+        
+        # Add some random variation to make it realistic (one call/put pair per strike)
+        noise = self.rng.random((len(strike_keys), 2))
+        call_oi *= (0.8 + 0.4 * noise[:, 0])
+        put_oi *= (0.8 + 0.4 * noise[:, 1])
+        
+        oi_data = {}
+        for strike, call_value, put_value in zip(strike_keys, call_oi.tolist(), put_oi.tolist()):
             # Round to realistic values
-            call_oi = round(call_oi, 2)
-            put_oi = round(put_oi, 2)
+            call_value = round(call_value, 2)
+            put_value = round(put_value, 2)
             
             oi_data[strike] = {
-                'call_oi': call_oi,
-                'put_oi': put_oi,
-                'total_oi': call_oi + put_oi,
-                'pcr': put_oi / call_oi if call_oi > 0 else 0
+                'call_oi': call_value,
+                'put_oi': put_value,
+                'total_oi': call_value + put_value,
+                'pcr': put_value / call_value if call_value > 0 else 0
             }
         
         self.logger.success(f"Generated theoretical OI data for {len(oi_data)} strikes")
@@ -125,33 +107,17 @@ class OpenInterestCalculator:
     
     def calculate_max_pain(self, oi_data: Dict[float, Dict[str, float]]) -> float:
         """Calculate Max Pain strike price"""
-        max_pain_data = []
+        strikes = list(oi_data.keys())
+        strike_values = np.array(strikes, dtype=np.float64)
+        call_oi = np.array([data['call_oi'] for data in oi_data.values()], dtype=np.float64)
+        put_oi = np.array([data['put_oi'] for data in oi_data.values()], dtype=np.float64)
         
-        for test_strike in oi_data.keys():
-            total_pain = 0
-            
-            for strike, data in oi_data.items():
-                # Call pain: if spot > strike, calls are ITM
-                if test_strike > strike:
-                    call_pain = (test_strike - strike) * data['call_oi']
-                else:
-                    call_pain = 0
-                
-                # Put pain: if spot < strike, puts are ITM  
-                if test_strike < strike:
-                    put_pain = (strike - test_strike) * data['put_oi']
-                else:
-                    put_pain = 0
-                
-                total_pain += call_pain + put_pain
-            
-            max_pain_data.append({
-                'strike': test_strike,
-                'total_pain': total_pain
-            })
+        # Pain at each test strike (rows): ITM calls below it plus ITM puts above it
+        moves = strike_values[:, None] - strike_values[None, :]
+        total_pain = np.maximum(moves, 0.0) @ call_oi + np.maximum(-moves, 0.0) @ put_oi
         
         # Find strike with minimum total pain
-        max_pain_strike = min(max_pain_data, key=lambda x: x['total_pain'])['strike']
+        max_pain_strike = strikes[int(np.argmin(total_pain))]
         self.logger.info(f"Max Pain calculated at strike: {max_pain_strike}")
         
         return max_pain_strike
@@ -161,29 +127,28 @@ class OpenInterestCalculator:
                                    spot_price: float) -> Tuple[List[Dict], List[Dict]]:
         """Identify support and resistance levels based on OI"""
         
+        strikes = list(oi_data.keys())
+        strike_values = np.array(strikes, dtype=np.float64)
+        call_oi = np.array([data['call_oi'] for data in oi_data.values()], dtype=np.float64)
+        put_oi = np.array([data['put_oi'] for data in oi_data.values()], dtype=np.float64)
+        
         # Support levels: High Put OI below current price
-        support_candidates = []
-        resistance_candidates = []
-        
-        for strike, data in oi_data.items():
-            if strike < spot_price:
-                # Potential support
-                support_candidates.append({
-                    'strike': strike,
-                    'put_oi': data['put_oi'],
-                    'distance': spot_price - strike
-                })
-            elif strike > spot_price:
-                # Potential resistance
-                resistance_candidates.append({
-                    'strike': strike,
-                    'call_oi': data['call_oi'],
-                    'distance': strike - spot_price
-                })
-        
-        # Sort by OI and select top 3
-        support_levels = sorted(support_candidates, key=lambda x: x['put_oi'], reverse=True)[:3]
-        resistance_levels = sorted(resistance_candidates, key=lambda x: x['call_oi'], reverse=True)[:3]
+        below = np.flatnonzero(strike_values < spot_price)
+        top_support = below[np.argsort(-put_oi[below], kind='stable')[:3]]
+        support_levels = [{
+            'strike': strikes[i],
+            'put_oi': oi_data[strikes[i]]['put_oi'],
+            'distance': spot_price - strikes[i]
+        } for i in top_support]
+        
+        # Resistance levels: High Call OI above current price
+        above = np.flatnonzero(strike_values > spot_price)
+        top_resistance = above[np.argsort(-call_oi[above], kind='stable')[:3]]
+        resistance_levels = [{
+            'strike': strikes[i],
+            'call_oi': oi_data[strikes[i]]['call_oi'],
+            'distance': strikes[i] - spot_price
+        } for i in top_resistance]
         
         self.logger.info(f"Identified {len(support_levels)} support and {len(resistance_levels)} resistance levels")
         
@@ -211,8 +176,13 @@ class OpenInterestCalculator:
 class MarketDataEnhancer:
     """Enhance options data with realistic market patterns"""
     
+    # Fields added to each option by enhance_options_data, in output order
+    _MARKET_FIELDS = ('open_interest', 'total_oi', 'change_in_oi', 'volume', 'bid_price',
+                      'ask_price', 'ltp', 'change', 'change_percent')
+    
     def __init__(self):
         self.oi_calculator = OpenInterestCalculator()
+        self.rng = np.random.default_rng(42)
         self.logger = logger
     
     def enhance_options_data(self, 
@@ -232,40 +202,41 @@ class MarketDataEnhancer:
             spot_price, strikes, volatility, days_to_expiry
         )
         
-        # Enhance each option with OI data
-        enhanced_data = []
-        for option in options_data:
-            strike = option['strike']
-            option_type = option['option_type'].lower()
-            
-            # Add OI data
-            if strike in oi_data:
-                if option_type == 'call':
-                    option['open_interest'] = oi_data[strike]['call_oi']
-                    option['total_oi'] = oi_data[strike]['total_oi']
-                else:
-                    option['open_interest'] = oi_data[strike]['put_oi']
-                    option['total_oi'] = oi_data[strike]['total_oi']
-                
-                # Add change in OI (random for demo)
-                option['change_in_oi'] = round(option['open_interest'] * (random.random() * 0.4 - 0.2), 2)
-                
-                # Add volume (typically 10-50% of OI)
-                option['volume'] = round(option['open_interest'] * (0.1 + 0.4 * random.random()), 2)
-                
-                # Add bid-ask spread
-                option['bid_price'] = max(0.05, option['theoretical_price'] * 0.98)
-                option['ask_price'] = option['theoretical_price'] * 1.02
-                
-                # Add LTP (Last Traded Price) - close to theoretical
-                option['ltp'] = option['theoretical_price'] * (0.95 + 0.1 * random.random())
-                option['change'] = option['ltp'] - option['theoretical_price']
-                option['change_percent'] = (option['change'] / option['theoretical_price']) * 100 if option['theoretical_price'] > 0 else 0
-            
-            enhanced_data.append(option)
+        # Enhance each option with OI data; market fields are computed column-wise
+        options = [option for option in options_data if option['strike'] in oi_data]
+        n = len(options)
+        
+        oi_keys = ['call_oi' if is_call_option(option['option_type']) else 'put_oi' for option in options]
+        open_interest = np.array([oi_data[option['strike']][key] for option, key in zip(options, oi_keys)], dtype=np.float64)
+        total_oi = [oi_data[option['strike']]['total_oi'] for option in options]
+        theoretical_price = np.array([option['theoretical_price'] for option in options], dtype=np.float64)
+        
+        # Random draws per option in the original order: change in OI, volume, LTP
+        draws = self.rng.random((n, 3))
+        
+        # Add change in OI (random for demo)
+        change_in_oi = np.round(open_interest * (draws[:, 0] * 0.4 - 0.2), 2)
         
-        self.logger.success(f"Enhanced {len(enhanced_data)} options with market data")
-        return enhanced_data
+        # Add volume (typically 10-50% of OI)
+        volume = np.round(open_interest * (0.1 + 0.4 * draws[:, 1]), 2)
+        
+        # Add bid-ask spread
+        bid_price = np.maximum(0.05, theoretical_price * 0.98)
+        ask_price = theoretical_price * 1.02
+        
+        # Add LTP (Last Traded Price) - close to theoretical
+        ltp = theoretical_price * (0.95 + 0.1 * draws[:, 2])
+        change = ltp - theoretical_price
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_percent = np.where(theoretical_price > 0, (change / theoretical_price) * 100, 0.0)
+        
+        for option, *values in zip(options, open_interest.tolist(), total_oi, change_in_oi.tolist(),
+                                   volume.tolist(), bid_price.tolist(), ask_price.tolist(),
+                                   ltp.tolist(), change.tolist(), change_percent.tolist()):
+            option.update(zip(self._MARKET_FIELDS, values))
+        
+        self.logger.success(f"Enhanced {len(options_data)} options with market data")
+        return options_data
     
     def calculate_comprehensive_analytics(self, 
                                         enhanced_data: List[Dict], 
@@ -274,23 +245,26 @@ class MarketDataEnhancer:
         
         self.logger.info("Calculating comprehensive market analytics")
         
-        # Separate calls and puts
-        calls = [opt for opt in enhanced_data if opt['option_type'].lower() == 'call']
-        puts = [opt for opt in enhanced_data if opt['option_type'].lower() == 'put']
+        # Index call and put OI by strike in a single pass (first quote per strike wins)
+        call_oi_by_strike = {}
+        put_oi_by_strike = {}
+        for opt in enhanced_data:
+            if is_call_option(opt['option_type']):
+                call_oi_by_strike.setdefault(opt['strike'], opt['open_interest'])
+            elif is_put_option(opt['option_type']):
+                put_oi_by_strike.setdefault(opt['strike'], opt['open_interest'])
         
         # Get unique strikes for OI analysis
-        strikes = sorted(list(set([opt['strike'] for opt in enhanced_data])))
-        oi_data = {}
+        strikes = sorted(set(opt['strike'] for opt in enhanced_data))
         
         # Build OI data structure
-        for strike in strikes:
-            call_data = next((opt for opt in calls if opt['strike'] == strike), None)
-            put_data = next((opt for opt in puts if opt['strike'] == strike), None)
-            
-            oi_data[strike] = {
-                'call_oi': call_data['open_interest'] if call_data else 0,
-                'put_oi': put_data['open_interest'] if put_data else 0
+        oi_data = {
+            strike: {
+                'call_oi': call_oi_by_strike.get(strike, 0),
+                'put_oi': put_oi_by_strike.get(strike, 0)
             }
+            for strike in strikes
+        }
         
         # Calculate analytics
         total_call_oi = sum([data['call_oi'] for data in oi_data.values()])
@@ -303,7 +277,7 @@ class MarketDataEnhancer:
         support_levels, resistance_levels = self.oi_calculator.identify_support_resistance(oi_data, spot_price)
         
         # ATM Strike
-        atm_strike = min(strikes, key=lambda x: abs(x - spot_price))
+        atm_strike = strikes[int(np.argmin(np.abs(np.asarray(strikes, dtype=np.float64) - spot_price)))]
         
         # OI Chart Data
         chart_data = self.oi_calculator.generate_oi_chart_data(oi_data)
@@ -319,8 +293,8 @@ class MarketDataEnhancer:
             'resistance_levels': resistance_levels,
             'oi_chart_data': chart_data,
             'strike_range': {
-                'min': min(strikes),
-                'max': max(strikes),
+                'min': strikes[0],
+                'max': strikes[-1],
                 'count': len(strikes)
             }
         }
@@ -4,11 +4,48 @@ Log Monitor for NIFTY Options Analysis
 Monitor log files in real-time and show important events
 """
 
+import argparse
 import os
-import time
-import subprocess
+import sys
+import asyncio
+from collections import deque
 from pathlib import Path
 
+try:
+    from watchfiles import awatch
+except ImportError:  # watchfiles ships with uvicorn[standard]
+    awatch = None
+
+async def follow_logs(log_paths):
+    """Print lines appended to the given log files as change events arrive"""
+    # Start each file at its current end, like tail -f
+    offsets = {os.path.abspath(path): os.path.getsize(path) for path in log_paths}
+    
+    # Watch the parent directories so files recreated by log rotation are still followed
+    watch_dirs = {os.path.dirname(path) for path in offsets}
+    
+    async for changes in awatch(*watch_dirs):
+        for _, path in changes:
+            if path not in offsets or not os.path.exists(path):
+                continue
+            
+            # Rotated or truncated file: start again from the beginning
+            if os.path.getsize(path) < offsets[path]:
+                offsets[path] = 0
+            
+            with open(path, 'rb') as f:
+                f.seek(offsets[path])
+                data = f.read()
+            
+            # Only emit complete lines; a partial trailing line is picked up on the next event
+            end = data.rfind(b"\n") + 1
+            if not end:
+                continue
+            offsets[path] += end
+            
+            for line in data[:end].decode('utf-8', errors='replace').splitlines():
+                print(f"[{os.path.basename(path)}] {line}")
+
 def monitor_logs():
     """Monitor log files and display important events"""
     logs_dir = Path("logs")
@@ -17,9 +54,9 @@ def monitor_logs():
     logs_dir.mkdir(exist_ok=True)
     
     log_files = [
-        "fastapi_app.log",
-        "greeks_calculator.log",
-        "angel_one_api.log",
+        "fastapi_nse.log",
+        "nifty_greeks.log",
+        "data_fetcher.log",
         "error.log"
     ]
     
@@ -44,43 +81,14 @@ def monitor_logs():
     print("Press Ctrl+C to stop monitoring")
     print("="*60)
     
+    if awatch is None:
+        print("Error: 'watchfiles' is not installed. Install it with: pip install watchfiles")
+        return
+    
     try:
-        # Use tail to follow all log files
-        cmd = ["tail", "-f"] + existing_logs
-        subprocess.run(cmd)
+        asyncio.run(follow_logs(existing_logs))
     except KeyboardInterrupt:
         print("\nLog monitoring stopped.")
-    except FileNotFoundError:
-        print("Error: 'tail' command not found. Trying alternative...")
-        
-        # Alternative method for systems without tail
-        try:
-            import threading
-            
-            def follow_file(filepath):
-                with open(filepath, 'r') as f:
-                    # Go to end of file
-                    f.seek(0, 2)
-                    while True:
-                        line = f.readline()
-                        if line:
-                            print(f"[{os.path.basename(filepath)}] {line.rstrip()}")
-                        else:
-                            time.sleep(0.1)
-            
-            threads = []
-            for log_file in existing_logs:
-                thread = threading.Thread(target=follow_file, args=(log_file,))
-                thread.daemon = True
-                thread.start()
-                threads.append(thread)
-            
-            # Keep main thread alive
-            while True:
-                time.sleep(1)
-                
-        except KeyboardInterrupt:
-            print("\nLog monitoring stopped.")
 
 def show_log_summary():
     """Show a summary of recent log entries"""
@@ -98,14 +106,15 @@ def show_log_summary():
         print(f"\n--- {log_file.name} ---")
         try:
             with open(log_file, 'r') as f:
-                lines = f.readlines()
-                # Show last 20 lines
-                for line in lines[-20:]:
-                    print(line.rstrip())
+                # Keep only the last 20 lines while streaming, then print them in one write
+                lines = deque(f, maxlen=20)
+            sys.stdout.write("".join(lines))
+            if lines and not lines[-1].endswith("\n"):
+                sys.stdout.write("\n")
         except Exception as e:
             print(f"Error reading {log_file}: {e}")
 
-def clear_logs():
+def clear_logs(assume_yes=False):
     """Clear all log files"""
     logs_dir = Path("logs")
     
@@ -123,7 +132,7 @@ def clear_logs():
     for log_file in log_files:
         print(f"  - {log_file.name}")
     
-    confirm = input("\nClear all log files? (y/N): ").strip().lower()
+    confirm = 'y' if assume_yes else input("\nClear all log files? (y/N): ").strip().lower()
     
     if confirm in ['y', 'yes']:
         for log_file in log_files:
@@ -137,6 +146,29 @@ def clear_logs():
         print("Operation cancelled.")
 
 def main():
+    """Run the command given on the command line, or the interactive menu on a terminal"""
+    parser = argparse.ArgumentParser(description="NIFTY options analysis log monitor")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--follow", action="store_true", help="monitor log files in real time")
+    group.add_argument("--summary", action="store_true", help="show the last lines of each log file")
+    group.add_argument("--clear", action="store_true", help="delete all log files")
+    parser.add_argument("-y", "--yes", action="store_true", help="do not ask before clearing logs")
+    args = parser.parse_args()
+    
+    if args.follow:
+        monitor_logs()
+    elif args.summary:
+        show_log_summary()
+    elif args.clear:
+        if not args.yes and not sys.stdin.isatty():
+            parser.error("--clear needs --yes when stdin is not a terminal")
+        clear_logs(assume_yes=args.yes)
+    elif sys.stdin.isatty():
+        interactive_menu()
+    else:
+        parser.error("no command given and stdin is not a terminal; use --follow, --summary or --clear")
+
+def interactive_menu():
     """Main menu for log monitoring"""
     print("NIFTY Options Analysis - Log Monitor")
     print("="*40)
@@ -3,18 +3,20 @@ NIFTY Options Greeks Calculator with NSE India Data
 Complete implementation using NSE India official API for real-time data
 """
 
+import math
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import json
-from scipy.stats import norm
-import warnings
-from typing import Dict, List, Optional, Tuple, Union
+from scipy.special import ndtr
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from loguru import logger
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from data_fetcher import NSEDataFetcher, get_nse_fetcher
+import bs_kernels
 
-warnings.filterwarnings('ignore')
 
 # Configure logging
 logger.add(
@@ -22,9 +24,75 @@ logger.add(
     rotation="1 day",
     retention="30 days", 
     level="INFO",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}"
+    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}",
+    enqueue=True
 )
 
+_INV_SQRT_2PI = 0.3989422804014327  # 1 / sqrt(2 * pi)
+
+STRIKE_INTERVAL = 50
+
+# Continuous-mode snapshots are appended here as a date-partitioned Parquet dataset
+SNAPSHOT_DIR = "nifty_snapshots"
+
+# Fixed label sets for the chain's repeated string columns, stored as pandas categoricals
+OPTION_TYPE_CATEGORIES = ['CALL', 'PUT']
+MONEYNESS_CATEGORIES = ['ITM', 'ATM', 'OTM']
+
+
+@lru_cache(maxsize=32)
+def _strike_offsets(num_strikes: int) -> np.ndarray:
+    """Read-only strike offsets from ATM, centred on zero, for a chain of num_strikes"""
+    offsets = (np.arange(num_strikes, dtype=np.float64) - num_strikes // 2) * STRIKE_INTERVAL
+    offsets.setflags(write=False)
+    return offsets
+
+
+@lru_cache(maxsize=4096)
+def _cached_price_and_greeks(S: float, K: float, T: float, r: float, sigma: float,
+                             is_call: bool) -> Tuple[float, Tuple[float, ...]]:
+    """Kernel price and rounded Greeks; refreshes re-price the same contracts repeatedly"""
+    price, delta, gamma, theta, vega, rho = bs_kernels.price_and_greeks(S, K, T, r, sigma, is_call)
+    return price, (round(delta, 6), round(gamma, 8), round(theta, 6), round(vega, 6), round(rho, 6))
+
+
+def _iv_brent(option_price: float, S: float, K: float, T: float, r: float, is_call: bool) -> float:
+    """Brent's method over the full volatility bracket; guaranteed to converge once the root is bracketed"""
+    # Imported on first use: the fallback is rare and scipy.optimize is slow to load
+    from scipy.optimize import brentq
+    
+    def price_error(vol: float) -> float:
+        return bs_kernels.price_and_vega(S, K, T, r, vol, is_call)[0] - option_price
+    
+    low, high = bs_kernels.MIN_VOLATILITY, bs_kernels.MAX_VOLATILITY
+    try:
+        if price_error(low) * price_error(high) > 0:
+            return math.nan
+        return brentq(price_error, low, high, xtol=1e-8, maxiter=100)
+    except (ValueError, RuntimeError, ZeroDivisionError):
+        return math.nan
+
+
+@lru_cache(maxsize=8)
+def _next_expiry_for(today_ordinal: int) -> datetime:
+    """Last Thursday of the month, rolling to next month once that day has been reached"""
+    today = datetime.fromordinal(today_ordinal)
+    next_month = datetime(today.year + today.month // 12, today.month % 12 + 1, 1)
+    last_day = next_month - timedelta(days=1)
+    last_thursday = last_day - timedelta(days=(last_day.weekday() - 3) % 7)
+    
+    # Expiry day itself counts as past, as intraday callers compared against datetime.now()
+    if last_thursday <= today:
+        return _next_expiry_for(next_month.toordinal())
+    
+    logger.info(f"Next expiry date: {last_thursday.strftime('%Y-%m-%d')}")
+    return last_thursday
+
+
+def _has_array(*values) -> bool:
+    """True if any input is an array, which bypasses the scalar price cache"""
+    return any(isinstance(value, (np.ndarray, pd.Series, list, tuple)) for value in values)
+
 
 class GreeksCalculator:
     """Advanced Black-Scholes Greeks calculator"""
@@ -32,112 +100,360 @@ class GreeksCalculator:
     @staticmethod
     def black_scholes_call(S: float, K: float, T: float, r: float, sigma: float) -> float:
         """Calculate Black-Scholes call option price"""
-        if T <= 0:
-            return max(S - K, 0)
-        
-        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
-        
-        call_price = S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
-        return max(call_price, 0)
+        if _has_array(S, K, T, r, sigma):
+            return GreeksCalculator.price_and_greeks(S, K, T, r, sigma, 'call')[0]
+        return _cached_price_and_greeks(float(S), float(K), float(T), float(r), float(sigma), True)[0]
     
     @staticmethod
     def black_scholes_put(S: float, K: float, T: float, r: float, sigma: float) -> float:
         """Calculate Black-Scholes put option price"""
-        if T <= 0:
-            return max(K - S, 0)
+        if _has_array(S, K, T, r, sigma):
+            return GreeksCalculator.price_and_greeks(S, K, T, r, sigma, 'put')[0]
+        return _cached_price_and_greeks(float(S), float(K), float(T), float(r), float(sigma), False)[0]
+    
+    @staticmethod
+    def price_and_greeks(S: float, K: float, T: float, r: float, sigma: float,
+                         option_type: str = 'call') -> Tuple[float, Dict[str, float]]:
+        """Calculate option price and all Greeks from a single (cached) kernel evaluation"""
+        is_call = bs_kernels.is_call_option(option_type)
         
-        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
+        # Array inputs are priced in one vectorized pass instead of through the scalar cache
+        if _has_array(S, K, T, r, sigma):
+            chain = GreeksCalculator.calculate_chain(S, K, T, r, sigma)
+            side = 'call' if is_call else 'put'
+            return chain[f'{side}_price'], {
+                'delta': np.round(chain[f'{side}_delta'], 6),
+                'gamma': np.round(chain['gamma'], 8),
+                'theta': np.round(chain[f'{side}_theta'], 6),
+                'vega': np.round(chain['vega'], 6),
+                'rho': np.round(chain[f'{side}_rho'], 6)
+            }
+        
+        # Keyed on the exact inputs; only identical contracts share an entry
+        price, (delta, gamma, theta, vega, rho) = _cached_price_and_greeks(
+            float(S), float(K), float(T), float(r), float(sigma), is_call
+        )
         
-        put_price = K * np.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
-        return max(put_price, 0)
+        return price, {
+            'delta': delta,
+            'gamma': gamma,
+            'theta': theta,
+            'vega': vega,
+            'rho': rho
+        }
+    
+    @staticmethod
+    def cache_info():
+        """Hit/miss statistics of the price and Greeks cache"""
+        return _cached_price_and_greeks.cache_info()
+    
+    @staticmethod
+    def cache_clear():
+        """Empty the price and Greeks cache"""
+        _cached_price_and_greeks.cache_clear()
     
     @staticmethod
     def calculate_greeks(S: float, K: float, T: float, r: float, sigma: float, option_type: str = 'call') -> Dict[str, float]:
         """Calculate all Greeks for an option"""
-        if T <= 0:
+        return GreeksCalculator.price_and_greeks(S, K, T, r, sigma, option_type)[1]
+    
+    @staticmethod
+    def calculate_implied_volatility(option_price: float, S: float, K: float, T: float, r: float, 
+                                    option_type: str = 'call', max_iterations: int = 100, 
+                                    tolerance: float = 1e-5) -> Optional[float]:
+        """Calculate implied volatility using the compiled Newton-Raphson kernel, with a Brent fallback"""
+        if T <= 0 or option_price <= 0:
+            return None
+        
+        S, K, T, r, option_price = float(S), float(K), float(T), float(r), float(option_price)
+        is_call = bs_kernels.is_call_option(option_type)
+        
+        # No volatility reproduces a price outside the no-arbitrage bounds
+        discounted_k = K * math.exp(-r * T)
+        lower_bound = max(S - discounted_k, 0.0) if is_call else max(discounted_k - S, 0.0)
+        upper_bound = S if is_call else discounted_k
+        if not lower_bound < option_price < upper_bound:
+            return None
+        
+        sigma = bs_kernels.implied_volatility(
+            option_price, S, K, T, r, is_call, int(max_iterations), float(tolerance)
+        )
+        
+        if math.isnan(sigma):
+            sigma = _iv_brent(option_price, S, K, T, r, is_call)
+            if math.isnan(sigma):
+                return None
+        
+        return round(sigma, 6)
+    
+    @staticmethod
+    def calculate_chain(S: float, K: np.ndarray, T: Union[float, np.ndarray], r: float,
+                        sigma: Union[float, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Calculate call/put prices and Greeks for a whole strike array in one vectorized pass
+        
+        T and sigma may be scalars or arrays broadcastable against K; entries with T <= 0 get their
+        expiry payoff, delta step and zero for the remaining Greeks.
+        """
+        K = np.asarray(K, dtype=np.float64)
+        
+        if np.ndim(T) == 0 and T <= 0:
+            zeros = np.zeros_like(K)
             return {
-                'delta': 1.0 if option_type == 'call' and S > K else (-1.0 if option_type == 'put' and S < K else 0.0),
-                'gamma': 0.0,
-                'theta': 0.0,
-                'vega': 0.0,
-                'rho': 0.0
+                'call_price': np.maximum(S - K, 0.0),
+                'put_price': np.maximum(K - S, 0.0),
+                'call_delta': np.where(S > K, 1.0, 0.0),
+                'put_delta': np.where(S < K, -1.0, 0.0),
+                'gamma': zeros,
+                'call_theta': zeros,
+                'put_theta': zeros,
+                'vega': zeros,
+                'call_rho': zeros,
+                'put_rho': zeros
             }
         
-        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
+        # Zero strikes or volatilities give inf/NaN entries rather than RuntimeWarnings
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # d1, d2 and the normal CDF/PDF terms are shared by every price and Greek
+            # Terms that depend only on T and sigma are formed once (scalars for a single expiry)
+            sqrt_t = np.sqrt(T)
+            v_sqrt_t = sigma * sqrt_t
+            d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / v_sqrt_t
+            d2 = d1 - v_sqrt_t
+            nd1 = ndtr(d1)
+            nd2 = ndtr(d2)
+            n_minus_d1 = ndtr(-d1)
+            n_minus_d2 = ndtr(-d2)
+            s_pdf_d1 = S * _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1)
+            discounted_k = K * np.exp(-r * T)
+            rho_scale = discounted_k * (T / 100)
+            theta_decay = s_pdf_d1 * (-sigma / (2 * sqrt_t))
+            
+            result = {
+                'call_price': np.maximum(S * nd1 - discounted_k * nd2, 0.0),
+                'put_price': np.maximum(discounted_k * n_minus_d2 - S * n_minus_d1, 0.0),
+                'call_delta': nd1,
+                'put_delta': nd1 - 1,
+                'gamma': s_pdf_d1 / (S * S * v_sqrt_t),
+                'call_theta': (theta_decay - r * discounted_k * nd2) / 365,
+                'put_theta': (theta_decay + r * discounted_k * n_minus_d2) / 365,
+                'vega': s_pdf_d1 * (sqrt_t / 100),
+                'call_rho': rho_scale * nd2,
+                'put_rho': -rho_scale * n_minus_d2
+            }
         
-        # Delta
-        if option_type.lower() == 'call':
-            delta = norm.cdf(d1)
-        else:
-            delta = norm.cdf(d1) - 1
+        # Expired entries of an expiry array are folded in afterwards, so the pass above stays branch-free
+        if np.ndim(T) > 0:
+            expired = np.asarray(T) <= 0
+            if expired.any():
+                payoff = {
+                    'call_price': np.maximum(S - K, 0.0),
+                    'put_price': np.maximum(K - S, 0.0),
+                    'call_delta': np.where(S > K, 1.0, 0.0),
+                    'put_delta': np.where(S < K, -1.0, 0.0)
+                }
+                result = {name: np.where(expired, payoff.get(name, 0.0), values)
+                          for name, values in result.items()}
+        
+        return result
+    
+    @staticmethod
+    def calculate_surface(S: float, K: np.ndarray, T: np.ndarray, r: float,
+                          sigma: Union[float, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Calculate call/put prices and Greeks for every (expiry, strike) pair in one pass
         
-        # Gamma (same for call and put)
-        gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
+        Expiries run down the rows and strikes across the columns, so each result is an
+        (E, K) grid and terms that depend only on T (sqrt(T), exp(-rT)) are computed once
+        per expiry. sigma may be a scalar or an (E, K) grid; expired rows get payoff values.
+        """
+        T_col = np.asarray(T, dtype=np.float64).reshape(-1, 1)
+        K_row = np.asarray(K, dtype=np.float64).reshape(1, -1)
+        return GreeksCalculator.calculate_chain(S, K_row, T_col, r, sigma)
+    
+    @staticmethod
+    def compile_chain(K: np.ndarray, T: float, r: float, sigma: float) -> Callable[[float], Dict[str, np.ndarray]]:
+        """
+        Specialise calculate_chain to fixed strikes, expiry, rate and volatility
         
-        # Theta
-        if option_type.lower() == 'call':
-            theta = (-S * norm.pdf(d1) * sigma / (2 * np.sqrt(T)) 
-                    - r * K * np.exp(-r * T) * norm.cdf(d2)) / 365
-        else:
-            theta = (-S * norm.pdf(d1) * sigma / (2 * np.sqrt(T)) 
-                    + r * K * np.exp(-r * T) * norm.cdf(-d2)) / 365
+        Everything except spot is folded into constants up front, so the returned
+        function reprices the chain from log(S) alone on each refresh.
+        """
+        K = np.asarray(K, dtype=np.float64)
+        T, r, sigma = float(T), float(r), float(sigma)
         
-        # Vega (same for call and put)
-        vega = S * norm.pdf(d1) * np.sqrt(T) / 100
+        if T <= 0:
+            return lambda S: GreeksCalculator.calculate_chain(S, K, T, r, sigma)
         
-        # Rho
-        if option_type.lower() == 'call':
-            rho = K * T * np.exp(-r * T) * norm.cdf(d2) / 100
-        else:
-            rho = -K * T * np.exp(-r * T) * norm.cdf(-d2) / 100
-        
-        return {
-            'delta': round(delta, 6),
-            'gamma': round(gamma, 8),
-            'theta': round(theta, 6),
-            'vega': round(vega, 6),
-            'rho': round(rho, 6)
-        }
+        sqrt_t = math.sqrt(T)
+        v_sqrt_t = sigma * sqrt_t
+        with np.errstate(divide='ignore'):
+            log_k_less_drift = np.log(K) - (r + 0.5 * sigma * sigma) * T
+        discounted_k = K * math.exp(-r * T)
+        call_theta_carry = -r * discounted_k / 365
+        put_theta_carry = r * discounted_k / 365
+        rho_scale = discounted_k * T / 100
+        theta_scale = -sigma / (2 * sqrt_t * 365)
+        
+        def price_at_spot(S: float) -> Dict[str, np.ndarray]:
+            d1 = (math.log(S) - log_k_less_drift) / v_sqrt_t
+            d2 = d1 - v_sqrt_t
+            nd1 = ndtr(d1)
+            nd2 = ndtr(d2)
+            n_minus_d1 = ndtr(-d1)
+            n_minus_d2 = ndtr(-d2)
+            s_pdf_d1 = S * _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1)
+            theta_decay = s_pdf_d1 * theta_scale
+            
+            return {
+                'call_price': np.maximum(S * nd1 - discounted_k * nd2, 0.0),
+                'put_price': np.maximum(discounted_k * n_minus_d2 - S * n_minus_d1, 0.0),
+                'call_delta': nd1,
+                'put_delta': nd1 - 1,
+                'gamma': s_pdf_d1 / (S * S * v_sqrt_t),
+                'call_theta': theta_decay + call_theta_carry * nd2,
+                'put_theta': theta_decay + put_theta_carry * n_minus_d2,
+                'vega': s_pdf_d1 * (sqrt_t / 100),
+                'call_rho': rho_scale * nd2,
+                'put_rho': -rho_scale * n_minus_d2
+            }
+        
+        return price_at_spot
     
     @staticmethod
-    def calculate_implied_volatility(option_price: float, S: float, K: float, T: float, r: float, 
-                                    option_type: str = 'call', max_iterations: int = 100, 
-                                    tolerance: float = 1e-5) -> Optional[float]:
-        """Calculate implied volatility using Newton-Raphson method"""
-        if T <= 0 or option_price <= 0:
-            return None
+    def calculate_greeks_batch(S: float, K: np.ndarray, T: Union[float, np.ndarray], r: float,
+                               sigma: Union[float, np.ndarray], is_call: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Calculate price and Greeks for a mixed batch of calls and puts
         
-        # Initial guess
-        sigma = 0.3
+        Calls and puts share one code path through the sign vector phi (+1 call, -1 put).
+        """
+        K = np.asarray(K, dtype=np.float64)
+        is_call = np.asarray(is_call, dtype=bool)
         
-        for i in range(max_iterations):
-            if option_type.lower() == 'call':
-                price = GreeksCalculator.black_scholes_call(S, K, T, r, sigma)
+        # With Numba the compiled kernel prices the batch in one loop; only very large batches on
+        # the main thread go parallel, since worker threads may call this concurrently
+        if bs_kernels.HAS_NUMBA and K.ndim == 1:
+            T, sigma, is_call = (np.ascontiguousarray(np.broadcast_to(a, K.shape))
+                                 for a in (np.asarray(T, dtype=np.float64),
+                                           np.asarray(sigma, dtype=np.float64), is_call))
+            if K.size >= bs_kernels.PARALLEL_MIN_BATCH and threading.current_thread() is threading.main_thread():
+                kernel = bs_kernels.chain_price_and_greeks_parallel
             else:
-                price = GreeksCalculator.black_scholes_put(S, K, T, r, sigma)
-            
-            diff = price - option_price
-            
-            if abs(diff) < tolerance:
-                return round(sigma, 6)
-            
-            # Vega for Newton-Raphson
-            d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-            vega = S * norm.pdf(d1) * np.sqrt(T)
-            
-            if vega < 1e-10:
-                return None
-            
-            # Update sigma
-            sigma = sigma - diff / vega
-            
-            if sigma <= 0:
-                sigma = 0.01
+                kernel = bs_kernels.chain_price_and_greeks
+            out = kernel(float(S), K, T, float(r), sigma, is_call)
+            return dict(zip(('price', 'delta', 'gamma', 'theta', 'vega', 'rho'), out))
+        
+        phi = np.where(is_call, 1.0, -1.0)
+        
+        if np.ndim(T) == 0 and T <= 0:
+            zeros = np.zeros_like(K)
+            return {
+                'price': np.maximum(phi * (S - K), 0.0),
+                'delta': np.where(phi * (S - K) > 0, phi, 0.0),
+                'gamma': zeros,
+                'theta': zeros,
+                'vega': zeros,
+                'rho': zeros
+            }
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sqrt_t = np.sqrt(T)
+            d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+            d2 = d1 - sigma * sqrt_t
+            n_phi_d1 = ndtr(phi * d1)
+            n_phi_d2 = ndtr(phi * d2)
+            pdf_d1 = np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+            discounted_k = K * np.exp(-r * T)
+            
+            result = {
+                'price': np.maximum(phi * (S * n_phi_d1 - discounted_k * n_phi_d2), 0.0),
+                'delta': phi * n_phi_d1,
+                'gamma': pdf_d1 / (S * sigma * sqrt_t),
+                'theta': (-S * pdf_d1 * sigma / (2 * sqrt_t) - phi * r * discounted_k * n_phi_d2) / 365,
+                'vega': S * pdf_d1 * sqrt_t / 100,
+                'rho': phi * discounted_k * T * n_phi_d2 / 100
+            }
+        
+        # Expired entries of an expiry array get intrinsic values, matching the Numba kernel
+        if np.ndim(T) > 0:
+            expired = np.asarray(T) <= 0
+            if expired.any():
+                payoff = {
+                    'price': np.maximum(phi * (S - K), 0.0),
+                    'delta': np.where(phi * (S - K) > 0, phi, 0.0)
+                }
+                result = {name: np.where(expired, payoff.get(name, 0.0), values)
+                          for name, values in result.items()}
+        
+        return result
+    
+    @staticmethod
+    def implied_volatility_slice(option_prices: np.ndarray, S: float, K: np.ndarray, T: float, r: float,
+                                 is_call: np.ndarray, max_iterations: int = 100,
+                                 tolerance: float = 1e-5,
+                                 sigma0: Optional[Union[float, np.ndarray]] = None) -> np.ndarray:
+        """
+        Implied volatility for a whole strike slice with a vectorized, bracketed Newton-Raphson
+        
+        Mirrors the scalar solver in bs_kernels element-wise; NaN where it does not converge.
+        sigma0 optionally warm-starts the solve (e.g. from the previous refresh); entries that
+        are missing or outside the volatility bracket fall back to the default seed of 0.3.
+        """
+        option_prices = np.asarray(option_prices, dtype=np.float64)
+        K = np.asarray(K, dtype=np.float64)
+        is_call = np.asarray(is_call, dtype=bool)
+        
+        result = np.full(K.shape, np.nan)
+        if T <= 0:
+            return result
+        
+        sigma = np.full(K.shape, 0.3)
+        if sigma0 is not None:
+            seed = np.broadcast_to(np.asarray(sigma0, dtype=np.float64), K.shape)
+            usable = (seed > bs_kernels.MIN_VOLATILITY) & (seed < bs_kernels.MAX_VOLATILITY)
+            sigma = np.where(usable, seed, sigma)
+        low = np.full(K.shape, bs_kernels.MIN_VOLATILITY)
+        high = np.full(K.shape, bs_kernels.MAX_VOLATILITY)
+        active = option_prices > 0
+        
+        # T is a scalar for the whole slice, so these go straight to libm
+        sqrt_t = math.sqrt(T)
+        discounted_k = K * math.exp(-r * T)
         
-        return None
+        for _ in range(max_iterations):
+            if not active.any():
+                break
+            
+            with np.errstate(divide='ignore'):
+                d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+            d2 = d1 - sigma * sqrt_t
+            price = np.where(is_call,
+                             S * ndtr(d1) - discounted_k * ndtr(d2),
+                             discounted_k * ndtr(-d2) - S * ndtr(-d1))
+            vega = S * np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI * sqrt_t
+            diff = price - option_prices
+            
+            converged = active & (np.abs(diff) < tolerance)
+            result[converged] = sigma[converged]
+            active &= ~converged
+            
+            # Price is increasing in sigma, so the sign of diff tightens each bracket
+            high = np.where(active & (diff > 0), sigma, high)
+            low = np.where(active & (diff <= 0), sigma, low)
+            
+            # Newton step, bisecting (in log space, as the kernel does) wherever vega
+            # vanishes or the step leaves the bracket
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton_sigma = sigma - diff / vega
+            use_newton = (vega > 1e-10) & (newton_sigma > low) & (newton_sigma < high)
+            sigma = np.where(active, np.where(use_newton, newton_sigma, np.sqrt(low * high)), sigma)
+        
+        # The few strikes Newton left unconverged (usually far wings) go to Brent one by one
+        for i in np.flatnonzero(active):
+            result[i] = _iv_brent(option_prices[i], S, K[i], T, r, is_call[i])
+        
+        return result
 
 
 class NSEFinanceAPI:
@@ -147,10 +463,18 @@ class NSEFinanceAPI:
         self.nse_fetcher = get_nse_fetcher()
         logger.info("NSE Finance API client initialized")
     
+    def warm_up(self) -> bool:
+        """Open the shared NSE session so the first request skips the cookie handshake"""
+        return self.nse_fetcher.warm_up()
+    
+    def close(self):
+        """Close the shared NSE session"""
+        self.nse_fetcher.close()
+    
     def get_nifty_price(self) -> Optional[float]:
         """Get current NIFTY 50 price from NSE"""
         try:
-            logger.info("Fetching NIFTY price from NSE India")
+            logger.debug("Fetching NIFTY price from NSE India")
             price = self.nse_fetcher.get_nifty_spot_price()
             
             if price:
@@ -168,7 +492,7 @@ class NSEFinanceAPI:
     def get_nifty_historical_data(self, days: int = 30) -> Optional[pd.DataFrame]:
         """Get historical NIFTY data for volatility calculation"""
         try:
-            logger.info(f"Fetching {days} days of NIFTY historical data")
+            logger.debug(f"Fetching {days} days of NIFTY historical data")
             df = self.nse_fetcher.get_historical_data(days)
             
             if df is not None and not df.empty:
@@ -182,11 +506,11 @@ class NSEFinanceAPI:
             logger.error(f"Error fetching historical data: {e}")
             return None
     
-    def calculate_historical_volatility(self, days: int = 30) -> float:
+    def calculate_historical_volatility(self, days: int = 30, symbol: str = "NIFTY") -> float:
         """Calculate historical volatility from NSE data"""
         try:
-            logger.info(f"Calculating {days}-day historical volatility")
-            volatility = self.nse_fetcher.calculate_historical_volatility(days)
+            logger.debug(f"Calculating {days}-day historical volatility")
+            volatility = self.nse_fetcher.calculate_historical_volatility(days, symbol)
             
             logger.success(f"Calculated volatility: {volatility:.2%}")
             return volatility
@@ -198,7 +522,7 @@ class NSEFinanceAPI:
     def get_options_chain_data(self, symbol: str = "NIFTY") -> Optional[pd.DataFrame]:
         """Get live options chain data from NSE"""
         try:
-            logger.info(f"Fetching options chain for {symbol} from NSE")
+            logger.debug(f"Fetching options chain for {symbol} from NSE")
             df = self.nse_fetcher.get_options_data_df(symbol)
             
             if df is not None and not df.empty:
@@ -213,6 +537,12 @@ class NSEFinanceAPI:
             return None
 
 
+@lru_cache(maxsize=32)
+def _compiled_chain(strike_bytes: bytes, T: float, r: float, sigma: float) -> Callable[[float], Dict[str, np.ndarray]]:
+    """Chain pricer specialised to one strike grid and expiry; refreshes only move spot"""
+    return GreeksCalculator.compile_chain(np.frombuffer(strike_bytes), T, r, sigma)
+
+
 class NiftyOptionsChain:
     """Generate complete NIFTY options chain with Greeks"""
     
@@ -223,42 +553,7 @@ class NiftyOptionsChain:
     
     def get_next_expiry(self) -> datetime:
         """Get next monthly expiry date (last Thursday of current month)"""
-        today = datetime.now()
-        
-        # Find last day of current month
-        if today.month == 12:
-            next_month = datetime(today.year + 1, 1, 1)
-        else:
-            next_month = datetime(today.year, today.month + 1, 1)
-        
-        last_day = next_month - timedelta(days=1)
-        
-        # Find last Thursday
-        days_to_thursday = (3 - last_day.weekday()) % 7
-        if days_to_thursday > 0:
-            last_thursday = last_day - timedelta(days=7 - days_to_thursday)
-        else:
-            last_thursday = last_day
-        
-        # If already past this month's expiry, get next month
-        if last_thursday < today:
-            if last_thursday.month == 12:
-                next_month = datetime(last_thursday.year + 1, 1, 1)
-            else:
-                next_month = datetime(last_thursday.year, last_thursday.month + 1, 1)
-            
-            last_day = next_month + timedelta(days=-1)
-            if last_day.month != next_month.month - 1:
-                last_day = next_month - timedelta(days=1)
-            
-            days_to_thursday = (3 - last_day.weekday()) % 7
-            if days_to_thursday > 0:
-                last_thursday = last_day - timedelta(days=7 - days_to_thursday)
-            else:
-                last_thursday = last_day
-        
-        logger.info(f"Next expiry date: {last_thursday.strftime('%Y-%m-%d')}")
-        return last_thursday
+        return _next_expiry_for(datetime.now().toordinal())
     
     def generate_options_chain(self, 
                              spot_price: Optional[float] = None,
@@ -266,14 +561,23 @@ class NiftyOptionsChain:
                              volatility: Optional[float] = None,
                              risk_free_rate: float = 0.065,
                              num_strikes: int = 31,
-                             atm_only: bool = False) -> pd.DataFrame:
+                             atm_only: bool = False,
+                             symbol: str = "NIFTY") -> pd.DataFrame:
         """Generate complete options chain with Greeks"""
         try:
-            logger.info("Generating NIFTY options chain with NSE data")
+            logger.debug(f"Generating {symbol} options chain with NSE data")
+            
+            # Try to get live options chain data from NSE
+            nse_options = self.nse_api.get_options_chain_data(symbol)
             
-            # Get spot price from NSE
+            # Get spot price from NSE; other indices use the underlying quoted with their chain
             if spot_price is None:
-                spot_price = self.nse_api.get_nifty_price()
+                if symbol == "NIFTY":
+                    spot_price = self.nse_api.get_nifty_price()
+                elif nse_options is not None:
+                    spot_price = nse_options.attrs.get('underlying_value')
+                if spot_price is None:
+                    raise ValueError(f"No spot price available for {symbol}")
             
             # Get expiry date
             if expiry_date is None:
@@ -281,158 +585,117 @@ class NiftyOptionsChain:
             
             # Get volatility from NSE
             if volatility is None:
-                volatility = self.nse_api.calculate_historical_volatility()
+                volatility = self.nse_api.calculate_historical_volatility(symbol=symbol)
             
             # Calculate time to expiry
             today = datetime.now()
             days_to_expiry = max((expiry_date - today).days, 0)
             time_to_expiry = days_to_expiry / 365.0
             
-            # Try to get live options chain data from NSE
-            nse_options = self.nse_api.get_options_chain_data()
+            # Chain-level scalars, attached to the DataFrame so callers avoid row lookups
+            chain_attrs = {
+                'spot_price': float(spot_price),
+                'expiry_date': expiry_date.strftime('%Y-%m-%d'),
+                'days_to_expiry': int(days_to_expiry),
+                'implied_volatility': float(volatility)
+            }
             
             if nse_options is not None and not nse_options.empty:
-                logger.info("Using live NSE options chain data")
-                # Use live NSE data and enhance with Greeks calculations
-                results = []
+                logger.debug("Using live NSE options chain data")
+                # Price and Greeks for every live contract in one vectorized pass
+                strikes = nse_options['strike'].to_numpy(dtype=np.float64)
+                option_types = nse_options['option_type'].to_numpy()
+                is_call = option_types == 'CALL'
+                greeks = self.greeks_calc.calculate_greeks_batch(
+                    spot_price, strikes, time_to_expiry, risk_free_rate, volatility, is_call
+                )
                 
-                for _, row in nse_options.iterrows():
-                    strike = row['strike']
-                    option_type = row['option_type']
-                    
-                    # Calculate Greeks
-                    greeks = self.greeks_calc.calculate_greeks(
-                        spot_price, strike, time_to_expiry, risk_free_rate, 
-                        volatility, option_type.lower()
+                # Determine moneyness
+                itm = np.where(is_call, strikes < spot_price, (option_types == 'PUT') & (strikes > spot_price))
+                moneyness = np.where(np.abs(strikes - spot_price) < 50, 'ATM', np.where(itm, 'ITM', 'OTM'))
+                
+                # NSE reports IV in percent; solve it from the last traded price where it is missing
+                ivs = nse_options['iv'].to_numpy(dtype=np.float64)
+                ivs = np.where(ivs > 1, ivs / 100, ivs)
+                market_prices = nse_options['last_price'].to_numpy(dtype=np.float64)
+                missing_iv = ~(ivs > 0) & (market_prices > 0)
+                if missing_iv.any():
+                    solved_ivs = self.greeks_calc.implied_volatility_slice(
+                        market_prices[missing_iv], spot_price, strikes[missing_iv],
+                        time_to_expiry, risk_free_rate, is_call[missing_iv]
                     )
-                    
-                    # Calculate theoretical price
-                    if option_type == 'CALL':
-                        theo_price = self.greeks_calc.black_scholes_call(
-                            spot_price, strike, time_to_expiry, risk_free_rate, volatility
-                        )
-                    else:
-                        theo_price = self.greeks_calc.black_scholes_put(
-                            spot_price, strike, time_to_expiry, risk_free_rate, volatility
-                        )
-                    
-                    # Determine moneyness
-                    if abs(strike - spot_price) < 50:
-                        moneyness = 'ATM'
-                    elif (option_type == 'CALL' and strike < spot_price) or \
-                         (option_type == 'PUT' and strike > spot_price):
-                        moneyness = 'ITM'
-                    else:
-                        moneyness = 'OTM'
-                    
-                    results.append({
-                        'symbol': 'NIFTY',
-                        'expiry_date': expiry_date.strftime('%Y-%m-%d'),
-                        'strike': float(strike),
-                        'option_type': option_type,
-                        'spot_price': float(spot_price),
-                        'market_price': float(row['last_price']),
-                        'theoretical_price': float(round(theo_price, 2)),
-                        'open_interest': int(row['open_interest']),
-                        'volume': int(row['volume']),
-                        'delta': float(greeks['delta']),
-                        'gamma': float(greeks['gamma']),
-                        'theta': float(greeks['theta']),
-                        'vega': float(greeks['vega']),
-                        'rho': float(greeks['rho']),
-                        'implied_volatility': float(row['iv'] / 100 if row['iv'] > 1 else row['iv']),
-                        'time_to_expiry': float(round(time_to_expiry, 6)),
-                        'days_to_expiry': int(days_to_expiry),
-                        'moneyness': moneyness,
-                        'data_source': 'NSE_LIVE'
-                    })
+                    ivs[missing_iv] = np.where(np.isnan(solved_ivs), ivs[missing_iv], solved_ivs)
                 
-                df = pd.DataFrame(results)
+                df = pd.DataFrame({
+                    'symbol': symbol,
+                    'expiry_date': chain_attrs['expiry_date'],
+                    'strike': strikes,
+                    'option_type': pd.Categorical(option_types),
+                    'spot_price': float(spot_price),
+                    'market_price': market_prices,
+                    'theoretical_price': np.round(greeks['price'], 2),
+                    'open_interest': nse_options['open_interest'].fillna(0).to_numpy(dtype=np.int64),
+                    'volume': nse_options['volume'].fillna(0).to_numpy(dtype=np.int64),
+                    'delta': np.round(greeks['delta'], 6),
+                    'gamma': np.round(greeks['gamma'], 8),
+                    'theta': np.round(greeks['theta'], 6),
+                    'vega': np.round(greeks['vega'], 6),
+                    'rho': np.round(greeks['rho'], 6),
+                    'implied_volatility': ivs,
+                    'time_to_expiry': round(time_to_expiry, 6),
+                    'days_to_expiry': int(days_to_expiry),
+                    'moneyness': pd.Categorical(moneyness, categories=MONEYNESS_CATEGORIES),
+                    'data_source': 'NSE_LIVE'
+                })
+                df.attrs.update(chain_attrs)
                 logger.success(f"Generated options chain with {len(df)} live NSE options")
                 return df
             
             # Fallback: Generate synthetic options chain
-            logger.info("Generating synthetic options chain")
+            logger.debug("Generating synthetic options chain")
             
             # Round to nearest 50
-            atm_strike = round(spot_price / 50) * 50
+            atm_strike = round(spot_price / STRIKE_INTERVAL) * STRIKE_INTERVAL
             
             # Generate strikes
-            if atm_only:
-                strikes = [atm_strike]
-            else:
-                strike_range = num_strikes // 2
-                strikes = [atm_strike + (i - strike_range) * 50 
-                          for i in range(num_strikes)]
-            
-            results = []
-            
-            for strike in strikes:
-                # Determine moneyness
-                if abs(strike - spot_price) < 50:
-                    moneyness = 'ATM'
-                elif strike < spot_price:
-                    call_moneyness = 'ITM'
-                    put_moneyness = 'OTM'
-                else:
-                    call_moneyness = 'OTM'
-                    put_moneyness = 'ITM'
-                
-                # Calculate Call Greeks
-                call_price = self.greeks_calc.black_scholes_call(
-                    spot_price, strike, time_to_expiry, risk_free_rate, volatility
-                )
-                call_greeks = self.greeks_calc.calculate_greeks(
-                    spot_price, strike, time_to_expiry, risk_free_rate, volatility, 'call'
-                )
-                
-                results.append({
-                    'symbol': 'NIFTY',
-                    'expiry_date': expiry_date.strftime('%Y-%m-%d'),
-                    'strike': float(strike),
-                    'option_type': 'CALL',
-                    'spot_price': float(spot_price),
-                    'theoretical_price': float(round(call_price, 2)),
-                    'delta': float(call_greeks['delta']),
-                    'gamma': float(call_greeks['gamma']),
-                    'theta': float(call_greeks['theta']),
-                    'vega': float(call_greeks['vega']),
-                    'rho': float(call_greeks['rho']),
-                    'implied_volatility': float(volatility),
-                    'time_to_expiry': float(round(time_to_expiry, 6)),
-                    'days_to_expiry': int(days_to_expiry),
-                    'moneyness': call_moneyness if strike != atm_strike else 'ATM',
-                    'data_source': 'THEORETICAL'
-                })
-                
-                # Calculate Put Greeks
-                put_price = self.greeks_calc.black_scholes_put(
-                    spot_price, strike, time_to_expiry, risk_free_rate, volatility
-                )
-                put_greeks = self.greeks_calc.calculate_greeks(
-                    spot_price, strike, time_to_expiry, risk_free_rate, volatility, 'put'
-                )
-                
-                results.append({
-                    'symbol': 'NIFTY',
-                    'expiry_date': expiry_date.strftime('%Y-%m-%d'),
-                    'strike': float(strike),
-                    'option_type': 'PUT',
-                    'spot_price': float(spot_price),
-                    'theoretical_price': float(round(put_price, 2)),
-                    'delta': float(put_greeks['delta']),
-                    'gamma': float(put_greeks['gamma']),
-                    'theta': float(put_greeks['theta']),
-                    'vega': float(put_greeks['vega']),
-                    'rho': float(put_greeks['rho']),
-                    'implied_volatility': float(volatility),
-                    'time_to_expiry': float(round(time_to_expiry, 6)),
-                    'days_to_expiry': int(days_to_expiry),
-                    'moneyness': put_moneyness if strike != atm_strike else 'ATM',
-                    'data_source': 'THEORETICAL'
-                })
+            strikes = atm_strike + _strike_offsets(1 if atm_only else num_strikes)
+            chain = _compiled_chain(
+                strikes.tobytes(), round(time_to_expiry, 8), round(risk_free_rate, 6), round(float(volatility), 6)
+            )(float(spot_price))
+            
+            # Moneyness for both sides; the strike nearest to spot is ATM
+            call_moneyness = np.where(strikes < spot_price, 'ITM', 'OTM')
+            put_moneyness = np.where(strikes < spot_price, 'OTM', 'ITM')
+            call_moneyness[strikes == atm_strike] = 'ATM'
+            put_moneyness[strikes == atm_strike] = 'ATM'
+            
+            # Rows alternate CALL/PUT per strike
+            def interleave(call_values, put_values):
+                values = np.empty(2 * len(strikes), dtype=np.result_type(call_values, put_values))
+                values[0::2] = call_values
+                values[1::2] = put_values
+                return values
+            
+            df = pd.DataFrame({
+                'symbol': symbol,
+                'expiry_date': chain_attrs['expiry_date'],
+                'strike': np.repeat(strikes, 2),
+                'option_type': pd.Categorical.from_codes(np.tile([0, 1], len(strikes)), OPTION_TYPE_CATEGORIES),
+                'spot_price': float(spot_price),
+                'theoretical_price': np.round(interleave(chain['call_price'], chain['put_price']), 2),
+                'delta': np.round(interleave(chain['call_delta'], chain['put_delta']), 6),
+                'gamma': np.round(np.repeat(chain['gamma'], 2), 8),
+                'theta': np.round(interleave(chain['call_theta'], chain['put_theta']), 6),
+                'vega': np.round(np.repeat(chain['vega'], 2), 6),
+                'rho': np.round(interleave(chain['call_rho'], chain['put_rho']), 6),
+                'implied_volatility': float(volatility),
+                'time_to_expiry': round(time_to_expiry, 6),
+                'days_to_expiry': int(days_to_expiry),
+                'moneyness': pd.Categorical(interleave(call_moneyness, put_moneyness), categories=MONEYNESS_CATEGORIES),
+                'data_source': 'THEORETICAL'
+            })
+            df.attrs.update(chain_attrs)
             
-            df = pd.DataFrame(results)
             logger.success(f"Generated synthetic options chain with {len(df)} options")
             
             return df
@@ -440,6 +703,39 @@ class NiftyOptionsChain:
         except Exception as e:
             logger.error(f"Error generating options chain: {e}")
             raise
+    
+    def reprice_chain(self, df: pd.DataFrame, spot_price: float, risk_free_rate: float = 0.065) -> pd.DataFrame:
+        """Reprice a generated chain at a new spot, keeping its strikes, expiry and volatility"""
+        strikes = df['strike'].to_numpy(dtype=np.float64)
+        is_call = df['option_type'].to_numpy() == 'CALL'
+        volatility = df.attrs['implied_volatility']
+        time_to_expiry = df.attrs['days_to_expiry'] / 365.0
+        
+        greeks = self.greeks_calc.calculate_greeks_batch(
+            spot_price, strikes, time_to_expiry, risk_free_rate, volatility, is_call
+        )
+        
+        # Same moneyness rules as generate_options_chain: live chains use a 50-point ATM band,
+        # synthetic chains mark the strike nearest to spot
+        itm = np.where(is_call, strikes < spot_price, strikes > spot_price)
+        if df['data_source'].iat[0] == 'NSE_LIVE':
+            atm = np.abs(strikes - spot_price) < 50
+        else:
+            atm = strikes == round(spot_price / STRIKE_INTERVAL) * STRIKE_INTERVAL
+        moneyness = np.where(atm, 'ATM', np.where(itm, 'ITM', 'OTM'))
+        
+        repriced = df.assign(
+            spot_price=float(spot_price),
+            theoretical_price=np.round(greeks['price'], 2),
+            delta=np.round(greeks['delta'], 6),
+            gamma=np.round(greeks['gamma'], 8),
+            theta=np.round(greeks['theta'], 6),
+            vega=np.round(greeks['vega'], 6),
+            rho=np.round(greeks['rho'], 6),
+            moneyness=pd.Categorical(moneyness, categories=MONEYNESS_CATEGORIES)
+        )
+        repriced.attrs = {**df.attrs, 'spot_price': float(spot_price)}
+        return repriced
 
 
 class PortfolioGreeksCalculator:
@@ -448,33 +744,45 @@ class PortfolioGreeksCalculator:
     def __init__(self):
         logger.info("Portfolio Greeks calculator initialized")
     
-    def calculate_portfolio_greeks(self, positions: List[Dict], spot_price: float) -> Dict:
-        """Calculate aggregate Greeks for a portfolio of options"""
+    # Per-position fields aggregated into portfolio totals, in output order
+    GREEK_FIELDS = ('delta', 'gamma', 'theta', 'vega', 'rho', 'price')
+    
+    def calculate_portfolio_greeks(self, positions: List[Dict], spot_price: float,
+                                   risk_free_rate: float = 0.065) -> Dict:
+        """
+        Calculate aggregate Greeks for a portfolio of options
+        
+        Positions that already carry delta/gamma/theta/vega/rho/price are summed as given;
+        the rest are priced from strike, option_type, days_to_expiry and volatility in one
+        vectorized batch.
+        """
         try:
             logger.info(f"Calculating portfolio Greeks for {len(positions)} positions")
             
-            total_delta = 0
-            total_gamma = 0
-            total_theta = 0
-            total_vega = 0
-            total_rho = 0
-            total_value = 0
-            
-            for pos in positions:
-                quantity = pos.get('quantity', 0)
-                delta = pos.get('delta', 0)
-                gamma = pos.get('gamma', 0)
-                theta = pos.get('theta', 0)
-                vega = pos.get('vega', 0)
-                rho = pos.get('rho', 0)
-                price = pos.get('price', 0)
-                
-                total_delta += quantity * delta
-                total_gamma += quantity * gamma
-                total_theta += quantity * theta
-                total_vega += quantity * vega
-                total_rho += quantity * rho
-                total_value += quantity * price
+            n = len(positions)
+            quantity = np.fromiter((pos.get('quantity', 0) for pos in positions), dtype=np.float64, count=n)
+            greeks = np.zeros((n, len(self.GREEK_FIELDS)))
+            needs_pricing = np.fromiter(('delta' not in pos for pos in positions), dtype=bool, count=n)
+            
+            supplied = [pos for pos in positions if 'delta' in pos]
+            if supplied:
+                greeks[~needs_pricing] = [[pos.get(field, 0) for field in self.GREEK_FIELDS] for pos in supplied]
+            
+            to_price = [pos for pos in positions if 'delta' not in pos]
+            if to_price:
+                m = len(to_price)
+                strikes = np.fromiter((pos['strike'] for pos in to_price), dtype=np.float64, count=m)
+                days = np.fromiter((pos.get('days_to_expiry', 30) for pos in to_price), dtype=np.float64, count=m)
+                volatility = np.fromiter((pos.get('volatility', 0.20) for pos in to_price), dtype=np.float64, count=m)
+                is_call = np.fromiter((bs_kernels.is_call_option(pos.get('option_type', 'call')) for pos in to_price),
+                                      dtype=bool, count=m)
+                batch = GreeksCalculator.calculate_greeks_batch(
+                    spot_price, strikes, days / 365.0, risk_free_rate, volatility, is_call
+                )
+                greeks[needs_pricing] = np.column_stack([batch[field] for field in self.GREEK_FIELDS])
+            
+            # One matrix-vector product reduces every field across all positions
+            total_delta, total_gamma, total_theta, total_vega, total_rho, total_value = (quantity @ greeks).tolist()
             
             portfolio_greeks = {
                 'total_delta': round(total_delta, 4),
@@ -496,7 +804,41 @@ class PortfolioGreeksCalculator:
 
 
 # Demo and testing functions
-def run_demo():
+def save_chain(df: pd.DataFrame, csv: bool = False, suffix: str = "", *,
+               timestamp: Optional[datetime] = None) -> str:
+    """Save an options chain as Parquet (columnar, no per-cell formatting), or CSV on request"""
+    timestamp = (timestamp or datetime.now()).strftime('%Y%m%d_%H%M%S')
+    if csv:
+        filename = f"nifty_options_nse_{timestamp}{suffix}.csv"
+        df.to_csv(filename, index=False)
+    else:
+        filename = f"nifty_options_nse_{timestamp}{suffix}.parquet"
+        df.to_parquet(filename, engine='pyarrow', compression='zstd', index=False)
+    return filename
+
+
+def append_snapshot(df: pd.DataFrame, base_dir: str = SNAPSHOT_DIR, *,
+                    timestamp: Optional[datetime] = None) -> str:
+    """Append a chain snapshot to a date-partitioned Parquet dataset, one small file per save"""
+    # Only the CLI writes snapshots, so the pricing module does not pay for pyarrow on import
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    
+    snapshot_ts = timestamp or datetime.now()
+    table = pa.Table.from_pandas(
+        df.assign(snapshot_ts=snapshot_ts, date=snapshot_ts.strftime('%Y-%m-%d')), preserve_index=False
+    )
+    ds.write_dataset(
+        table, base_dir, format="parquet",
+        partitioning=["date"], partitioning_flavor="hive",
+        basename_template=f"snapshot-{snapshot_ts:%H%M%S%f}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        file_options=ds.ParquetFileFormat().make_write_options(compression="zstd")
+    )
+    return base_dir
+
+
+def run_demo(csv: bool = False):
     """Run a demonstration of the NIFTY Greeks calculator with NSE data"""
     print("🚀 NIFTY OPTIONS GREEKS CALCULATOR - NSE INDIA EDITION")
     print("=" * 70)
@@ -511,22 +853,20 @@ def run_demo():
         
         # Display sample data
         print(f"\n✅ Generated {len(df)} options")
-        print(f"Spot Price: ₹{df.iloc[0]['spot_price']}")
-        print(f"Expiry: {df.iloc[0]['expiry_date']}")
-        print(f"Days to Expiry: {df.iloc[0]['days_to_expiry']}")
-        print(f"Implied Volatility: {df.iloc[0]['implied_volatility']:.2%}")
-        print(f"Data Source: {df.iloc[0].get('data_source', 'N/A')}")
+        print(f"Spot Price: ₹{df.attrs['spot_price']}")
+        print(f"Expiry: {df.attrs['expiry_date']}")
+        print(f"Days to Expiry: {df.attrs['days_to_expiry']}")
+        print(f"Implied Volatility: {df.attrs['implied_volatility']:.2%}")
+        print(f"Data Source: {df['data_source'].iat[0] if 'data_source' in df else 'N/A'}")
         
         # Show ATM options
-        atm_options = df[df['moneyness'] == 'ATM']
+        atm_options = df[df['moneyness'].to_numpy() == 'ATM']
         if not atm_options.empty:
             print("\n📍 ATM Options:")
             print(atm_options[['strike', 'option_type', 'theoretical_price', 
                              'delta', 'gamma', 'theta', 'vega']].to_string(index=False))
         
-        # Save to CSV
-        filename = f"nifty_options_nse_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        df.to_csv(filename, index=False)
+        filename = save_chain(df, csv=csv)
         print(f"\n💾 Data saved to: {filename}")
         
         print("\n" + "=" * 70)
@@ -537,5 +877,100 @@ def run_demo():
         logger.exception("Demo failed")
 
 
+def run_continuous(update_interval: float = 30.0, csv: bool = False, save_every: int = 10,
+                   full_refresh_every: int = 20):
+    """
+    Refresh the options chain every update_interval seconds until interrupted
+    
+    Between full regenerations (every full_refresh_every updates) only the spot price is
+    fetched and the previous chain is repriced, so the NSE chain is not downloaded every tick.
+    """
+    print(f"🔁 Refreshing the NIFTY options chain every {update_interval:g}s (Ctrl+C to stop)")
+    options_chain = NiftyOptionsChain()
+    bs_kernels.warmup()
+    
+    # Snapshots are written in the background so the next fetch does not wait on disk I/O
+    saver = ThreadPoolExecutor(max_workers=2)
+    
+    def report_save(future):
+        if future.exception() is not None:
+            logger.error(f"Snapshot save failed: {future.exception()}")
+    
+    # Ticks are scheduled against monotonic deadlines, so fetch/compute time does not add up as drift
+    next_tick = time.monotonic()
+    interval = update_interval
+    ema_latency = None
+    updates = 0
+    df = None
+    
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                if df is None or updates % full_refresh_every == 0:
+                    df = options_chain.generate_options_chain()
+                else:
+                    df = options_chain.reprice_chain(df, options_chain.nse_api.get_nifty_price())
+                updates += 1
+                
+                # Stamp the snapshot with the tick's time, not when the background save runs
+                tick_time = datetime.now()
+                
+                atm = df[df['moneyness'].to_numpy() == 'ATM']
+                prices = dict(zip(atm['option_type'].to_numpy(), atm['theoretical_price'].to_numpy()))
+                logger.info(f"Update {updates}: spot ₹{df.attrs['spot_price']:,.2f} | "
+                            f"ATM CALL {prices.get('CALL', float('nan')):.2f} PUT {prices.get('PUT', float('nan')):.2f} | "
+                            f"IV {df.attrs['implied_volatility']:.2%}")
+                
+                # Parquet snapshots accumulate in one dataset; CSV keeps a file per save
+                if updates % save_every == 0:
+                    if csv:
+                        future = saver.submit(save_chain, df, csv, f"_update_{updates}", timestamp=tick_time)
+                    else:
+                        future = saver.submit(append_snapshot, df, timestamp=tick_time)
+                    future.add_done_callback(report_save)
+            except Exception as e:
+                logger.error(f"Options chain update failed: {e}")
+            
+            # Stretch the interval while updates are slow instead of hitting NSE back to back
+            latency = time.monotonic() - started
+            ema_latency = latency if ema_latency is None else 0.9 * ema_latency + 0.1 * latency
+            effective = max(update_interval, 1.5 * ema_latency)
+            if (effective > update_interval) != (interval > update_interval):
+                if effective > update_interval:
+                    logger.warning(f"Updates take {ema_latency:.1f}s on average; "
+                                   f"backing off from {update_interval:g}s to {effective:.1f}s")
+                else:
+                    logger.info(f"Update latency recovered; back to {update_interval:g}s")
+            interval = effective
+            
+            # Sleep only the residual to the next tick; ticks already missed are skipped, not replayed
+            now = time.monotonic()
+            next_tick += interval
+            if next_tick <= now:
+                missed = int((now - next_tick) // interval) + 1
+                logger.warning(f"Update took longer than {interval:.1f}s; skipping {missed} tick(s)")
+                next_tick += missed * interval
+            time.sleep(next_tick - now)
+    
+    except KeyboardInterrupt:
+        print(f"\n⏹️  Stopped after {updates} updates")
+    finally:
+        saver.shutdown(wait=True)
+
+
 if __name__ == "__main__":
-    run_demo()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="NIFTY options Greeks demo")
+    parser.add_argument("--csv", action="store_true", help="save the chain as CSV instead of Parquet")
+    parser.add_argument("--watch", type=float, nargs="?", const=30.0, metavar="SECONDS",
+                        help="keep refreshing the chain every SECONDS (default 30) until interrupted")
+    args = parser.parse_args()
+    
+    if args.watch is not None:
+        if args.watch <= 0:
+            parser.error("--watch interval must be positive")
+        run_continuous(update_interval=args.watch, csv=args.csv)
+    else:
+        run_demo(csv=args.csv)
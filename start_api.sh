@@ -31,4 +31,4 @@ echo ""
 echo "Press Ctrl+C to stop the server"
 echo ""
 
-python3 -m uvicorn app:app --host 0.0.0.0 --port 8000 --reload --log-level info
+DEV=1 python3 -m uvicorn app:app --host 0.0.0.0 --port 8000 --reload --log-level info
@@ -0,0 +1,39 @@
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+
+
+def _routes(module):
+    return {route.path for route in module.app.routes}
+
+
+@pytest.fixture
+def reload_app(monkeypatch):
+    def load(dev):
+        if dev:
+            monkeypatch.setenv("DEV", "1")
+        else:
+            monkeypatch.delenv("DEV", raising=False)
+        return importlib.reload(app_module)
+    
+    yield load
+    monkeypatch.delenv("DEV", raising=False)
+    importlib.reload(app_module)
+
+
+def test_cache_clear_is_not_registered_in_production(reload_app):
+    module = reload_app(dev=False)
+    
+    assert "/api/cache/clear" not in _routes(module)
+    assert TestClient(module.app).post("/api/cache/clear").status_code in (404, 405)
+
+
+def test_cache_clear_is_registered_in_development(reload_app):
+    module = reload_app(dev=True)
+    
+    response = TestClient(module.app).post("/api/cache/clear")
+    assert response.status_code == 200
+    assert response.json()["success"] is True
@@ -0,0 +1,35 @@
+import math
+
+import numpy as np
+
+import bs_kernels
+
+
+def test_implied_volatility_returns_nan_when_it_does_not_converge():
+    # Three iterations cannot reach a 1e-12 tolerance for a far out-of-the-money option
+    assert math.isnan(bs_kernels.implied_volatility(1e-9, 24500.0, 30000.0, 1 / 365, 0.065, True, 3, 1e-12))
+
+
+def test_implied_volatility_recovers_the_pricing_volatility():
+    price = bs_kernels.price_and_greeks(24500.0, 24600.0, 30 / 365, 0.065, 0.18, True)[0]
+    sigma = bs_kernels.implied_volatility(price, 24500.0, 24600.0, 30 / 365, 0.065, True, 100, 1e-8)
+    
+    assert abs(sigma - 0.18) < 1e-6
+
+
+def test_zero_volatility_greeks_stay_nan():
+    # Callers detect degenerate inputs with np.isnan, so NaN must survive the compiled kernels
+    gamma = bs_kernels.price_and_greeks(24500.0, 24500.0, 0.1, 0.065, 0.0, True)[2]
+    out = bs_kernels.chain_price_and_greeks(24500.0, np.array([24500.0]), np.array([0.1]), 0.065,
+                                            np.array([0.0]), np.array([True]))
+    
+    assert np.isnan(gamma)
+    assert np.isnan(out[2, 0])
+
+
+def test_option_type_helpers_share_the_prefix_rule():
+    for label in ('call', 'CALL', 'CE'):
+        assert bs_kernels.is_call_option(label) and not bs_kernels.is_put_option(label)
+    for label in ('put', 'PUT', 'PE'):
+        assert bs_kernels.is_put_option(label) and not bs_kernels.is_call_option(label)
+    assert not bs_kernels.is_call_option('') and not bs_kernels.is_put_option('')
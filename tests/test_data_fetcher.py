@@ -0,0 +1,117 @@
+import threading
+import types
+
+import pytest
+
+import data_fetcher
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'{"ok": 1}'):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+
+
+class FakeSession:
+    """Stands in for curl_cffi's Session; get() can be held open to simulate an in-flight request"""
+    
+    def __init__(self, **kwargs):
+        self.closed = False
+        self.cookies = types.SimpleNamespace(jar=[], set=lambda *args, **kwargs: None)
+        self.in_request = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+        self.requests = 0
+    
+    def get(self, url, allow_redirects=True):
+        if self.closed:
+            raise RuntimeError("session closed")
+        if url == f"{data_fetcher.NSEDataFetcher.BASE_URL}/":
+            return FakeResponse(200, b"")
+        
+        self.requests += 1
+        self.in_request.set()
+        self.release.wait(5)
+        if self.closed:
+            raise RuntimeError("session closed mid-request")
+        return FakeResponse(200)
+    
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fetcher(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_fetcher.requests, "Session", FakeSession)
+    monkeypatch.setattr(data_fetcher.NSEDataFetcher, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(data_fetcher.NSEDataFetcher, "COOKIE_FILE", tmp_path / "nse_cookies.json")
+    instance = data_fetcher.NSEDataFetcher()
+    yield instance
+    instance.close()
+
+
+def test_rotation_does_not_break_in_flight_request(fetcher):
+    first = fetcher.session
+    first.release.clear()
+    result = {}
+    
+    worker = threading.Thread(target=lambda: result.update(data=fetcher._make_request("https://example/api")))
+    worker.start()
+    assert first.in_request.wait(5)
+    
+    # Another thread hits a 403 and rotates while the request above is still running
+    fetcher._rotate_browser(first)
+    first.release.set()
+    worker.join(5)
+    
+    assert result['data'] == {'ok': 1}
+    assert first.requests == 1
+    assert not first.closed
+    assert fetcher.session is not first
+
+
+def test_concurrent_rotations_of_the_same_session_rotate_once(fetcher):
+    first = fetcher.session
+    
+    threads = [threading.Thread(target=fetcher._rotate_browser, args=(first,)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    
+    second = fetcher.session
+    assert second is not first
+    
+    # A stale caller does not replace the session that superseded its own
+    fetcher._rotate_browser(first)
+    assert fetcher.session is second
+
+
+def test_chain_cache_round_trip_keeps_attrs_and_dtypes(fetcher):
+    import pyarrow.parquet as pq
+    
+    df = data_fetcher.pd.DataFrame({
+        'strike': [24500.0, 24500.0],
+        'option_type': data_fetcher.pd.Categorical(['CALL', 'PUT']),
+        'iv': [14.2, 15.1],
+    })
+    df.attrs['underlying_value'] = 24512.35
+    
+    fetcher._write_cached_frame("NIFTY_options_chain", df)
+    cached = fetcher._read_cached_frame("NIFTY_options_chain", ttl=60)
+    
+    assert cached.attrs['underlying_value'] == 24512.35
+    assert isinstance(cached['option_type'].dtype, data_fetcher.pd.CategoricalDtype)
+    assert cached['strike'].tolist() == [24500.0, 24500.0]
+    
+    # The spot is stored by the cache itself, not left to pandas' own attrs handling
+    schema = pq.read_schema(fetcher.CACHE_DIR / "NIFTY_options_chain.parquet")
+    assert fetcher.CACHE_ATTRS_KEY in schema.metadata
+
+
+def test_chain_cache_expires(fetcher):
+    df = data_fetcher.pd.DataFrame({'strike': [24500.0]})
+    fetcher._write_cached_frame("NIFTY_options_chain", df)
+    
+    assert fetcher._read_cached_frame("NIFTY_options_chain", ttl=-1) is None
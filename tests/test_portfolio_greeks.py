@@ -0,0 +1,35 @@
+import pytest
+
+from nifty_greeks import GreeksCalculator, PortfolioGreeksCalculator
+
+
+def test_mixed_portfolio_keeps_supplied_greeks_and_prices_the_rest():
+    supplied = {'quantity': 2, 'delta': 0.5, 'gamma': 0.001, 'theta': -3.0,
+                'vega': 20.0, 'rho': 5.0, 'price': 150.0}
+    to_price = {'quantity': -1, 'strike': 24500, 'option_type': 'put',
+                'days_to_expiry': 30, 'volatility': 0.15}
+    
+    result = PortfolioGreeksCalculator().calculate_portfolio_greeks([supplied, to_price], 24500.0)
+    
+    price, greeks = GreeksCalculator.price_and_greeks(24500.0, 24500.0, 30 / 365.0, 0.065, 0.15, 'put')
+    assert result['num_positions'] == 2
+    assert result['total_delta'] == pytest.approx(2 * 0.5 - greeks['delta'], abs=1e-4)
+    assert result['total_vega'] == pytest.approx(2 * 20.0 - greeks['vega'], abs=1e-4)
+    assert result['total_value'] == pytest.approx(2 * 150.0 - price, abs=0.01)
+
+
+def test_greeks_only_portfolio_needs_no_strikes():
+    positions = [{'quantity': 1, 'delta': 0.4, 'gamma': 0.002, 'theta': -2.0,
+                  'vega': 10.0, 'rho': 3.0, 'price': 90.0}]
+    
+    result = PortfolioGreeksCalculator().calculate_portfolio_greeks(positions, 24500.0)
+    
+    assert result['total_delta'] == 0.4
+    assert result['total_value'] == 90.0
+
+
+def test_empty_portfolio():
+    result = PortfolioGreeksCalculator().calculate_portfolio_greeks([], 24500.0)
+    
+    assert result['num_positions'] == 0
+    assert result['total_delta'] == 0.0